@@ -2,9 +2,12 @@
 Integration tests for automated trading system
 """
 
+import sys
 import unittest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from datetime import date, datetime
+
+import pandas as pd
 
 from tradingagents.services.execution_service import TradeExecutionService
 from tradingagents.services.automation_service import AutomationService
@@ -36,6 +39,36 @@ class TestMarketDetector(unittest.TestCase):
         market = MarketDetector.detect_market("RELIANCE")
         self.assertIn(market, [Market.INDIA_NSE, Market.INDIA_BSE])
 
+    def test_detect_market_batch(self):
+        """Test batch detection matches per-symbol detection"""
+        symbols = ["btc-usd", "AAPL", "RELIANCE", "ETHUSDT", "UNKNOWNCO"]
+        self.assertEqual(
+            MarketDetector.detect_market_batch(symbols),
+            [MarketDetector.detect_market(symbol) for symbol in symbols]
+        )
+
+    def test_normalize_crypto_symbol(self):
+        """Test crypto symbols are rewritten into each broker's pair format"""
+        cases = [
+            ("BTC-USD", BrokerType.BINANCE, "BTCUSDT"),
+            ("ETH", BrokerType.BINANCE, "ETHUSDT"),
+            ("ETHBTC", BrokerType.BINANCE, "ETHBTC"),
+            ("BTCUSDT", BrokerType.COINBASE, "BTC-USD"),
+            ("BTC-USDT", BrokerType.COINBASE, "BTC-USD"),
+            ("SOL", BrokerType.COINBASE, "SOL-USD"),
+            ("BTC-USD", BrokerType.COINBASE, "BTC-USD"),
+        ]
+        for symbol, broker, expected in cases:
+            self.assertEqual(MarketDetector.normalize_symbol(symbol, Market.CRYPTO, broker), expected)
+        self.assertEqual(MarketDetector.normalize_symbol("AAPL", Market.US_NYSE, BrokerType.ALPACA), "AAPL")
+
+    def test_detection_is_cached(self):
+        """Test repeated lookups for a symbol are served from the cache"""
+        detect_market_and_broker("MSFT")
+        hits = detect_market_and_broker.cache_info().hits
+        self.assertEqual(detect_market_and_broker("MSFT"), detect_market_and_broker("MSFT"))
+        self.assertEqual(detect_market_and_broker.cache_info().hits, hits + 2)
+
 
 class TestMarketHours(unittest.TestCase):
     """Test market hours service"""
@@ -127,6 +160,78 @@ class TestRiskLimits(unittest.TestCase):
         self.assertFalse(result["allowed"])
         self.assertEqual(result["limit_type"], "position_size")
 
+    def test_global_gates_invalidated_by_record_trade(self):
+        """Test cached global gates are refreshed after recording a trade"""
+        risk_limits = RiskLimits(max_daily_trades=1)
+
+        result = risk_limits.can_trade("AAPL", "BUY", 1, 100.0, 10000.0, "US")
+        self.assertTrue(result["allowed"])
+
+        risk_limits.record_trade("AAPL", "BUY", 1, 100.0, "US")
+
+        result = risk_limits.can_trade("AAPL", "BUY", 1, 100.0, 10000.0, "US")
+        self.assertFalse(result["allowed"])
+        self.assertEqual(result["limit_type"], "daily_trades")
+
+    def test_can_trade_many_stages_basket(self):
+        """Test basket checks count earlier allowed orders against the limits"""
+        risk_limits = RiskLimits(max_daily_trades=2)
+        orders = [
+            {"symbol": sym, "action": "BUY", "quantity": 5, "price": 100.0, "market": "US"}
+            for sym in ("AAPL", "MSFT", "GOOGL")
+        ]
+
+        decisions = risk_limits.can_trade_many(orders, portfolio_value=10000.0)
+
+        self.assertEqual([d.allowed for d in decisions], [True, True, False])
+        self.assertEqual(decisions[2].limit_type, "daily_trades")
+        self.assertEqual(risk_limits.daily_trades, {})
+
+    def test_pnl_lookback_window(self):
+        """Test losses older than the lookback window stop counting as risk"""
+        risk_limits = RiskLimits(max_lookback_days=2)
+
+        risk_limits.record_pnl(-100.0, "2024-01-01")
+        risk_limits.record_pnl(-50.0, "2024-01-02")
+        self.assertEqual(risk_limits._negative_pnl_total, 150.0)
+
+        # Third day evicts the first one
+        risk_limits.record_pnl(25.0, "2024-01-03")
+        self.assertEqual(len(risk_limits.daily_pnl), 2)
+        self.assertEqual(risk_limits._negative_pnl_total, 50.0)
+
+    def test_pnl_for_local_date_counts_today(self):
+        """Test P&L recorded for the local date lands in today's bucket"""
+        risk_limits = RiskLimits()
+
+        risk_limits.record_pnl(-40.0, date.today().isoformat())
+
+        summary = risk_limits.get_risk_summary(10000.0)
+        self.assertEqual(summary["date"], date.today().isoformat())
+        self.assertEqual(summary["daily_pnl"], -40.0)
+
+    def test_rejection_precedence(self):
+        """Test gates reject in order: trades, loss, size, balance, concentration, risk, VIX"""
+        risk_limits = RiskLimits(max_position_size=0.1, max_portfolio_risk=0.02)
+        yesterday = date.fromordinal(date.today().toordinal() - 1).isoformat()
+        risk_limits.record_pnl(-500.0, yesterday)
+        high_vix = Mock()
+        high_vix.Ticker.return_value.history.return_value = pd.DataFrame({"Close": [40.0]})
+
+        def check(quantity):
+            return risk_limits.can_trade("AAPL", "BUY", quantity, 100.0, 10000.0, "US_NYSE")
+
+        with patch.dict(sys.modules, {"yfinance": high_vix}):
+            self.assertEqual(check(20)["limit_type"], "position_size")
+            self.assertEqual(check(5)["limit_type"], "portfolio_risk")
+            high_vix.Ticker.assert_not_called()
+
+            risk_limits.record_pnl(600.0, yesterday)
+            self.assertEqual(check(5)["limit_type"], "circuit_breaker")
+
+            risk_limits.record_pnl(-600.0)
+            self.assertEqual(check(20)["limit_type"], "daily_loss")
+
 
 class TestExecutionService(unittest.TestCase):
     """Test execution service"""
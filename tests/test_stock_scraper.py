@@ -0,0 +1,266 @@
+"""
+Tests for the trending stock scraper's caching and aggregation
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+from tradingagents.services import stock_scraper
+from tradingagents.services.stock_scraper import StockScraper, FINVIZ_SCREENER_URL, YAHOO_TRENDING_API_URL
+
+
+def _stock(ticker, score=0.5, source='test'):
+    return {'ticker': ticker, 'name': ticker, 'price': 10.0, 'change_pct': 1.0,
+            'source': source, 'sentiment': 0.6, 'score': score}
+
+
+def _response(status, content=b'', etag=None):
+    return Mock(status_code=status, content=content, headers={'ETag': etag} if etag else {})
+
+
+class _FakeAsyncResponse:
+    def __init__(self, status, content, etag):
+        self.status = status
+        self.headers = {'ETag': etag} if etag else {}
+        self._content = content
+
+    async def read(self):
+        return self._content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeAsyncSession:
+    """aiohttp-like session answering every url from a (status, body, etag) script"""
+
+    def __init__(self, script):
+        self.script = script
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers or {}))
+        return _FakeAsyncResponse(*self.script(url))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestTrendingIndex(unittest.TestCase):
+    """Test the incremental aggregation index"""
+
+    def setUp(self):
+        self.scraper = StockScraper()
+
+    def test_update_source_marks_only_changed_tickers(self):
+        """Test a new payload dirties only the tickers whose data changed"""
+        self.scraper._update_source('yahoo', [_stock('AAPL'), _stock('MSFT')])
+        self.assertEqual(self.scraper._dirty, {'AAPL', 'MSFT'})
+        self.scraper._dirty.clear()
+
+        self.scraper._update_source('yahoo', [_stock('AAPL', score=0.9), _stock('MSFT'), _stock('NVDA')])
+        self.assertEqual(self.scraper._dirty, {'AAPL', 'NVDA'})
+
+    def test_aggregate_rescores_only_changed_tickers(self):
+        """Test unchanged sources and tickers are not re-scored"""
+        finviz = [_stock('TSLA')]
+        self.scraper._aggregate_stocks({'yahoo': [_stock('AAPL'), _stock('MSFT')], 'finviz': finviz})
+
+        with patch.object(self.scraper, '_score_ticker', wraps=self.scraper._score_ticker) as score:
+            rows = self.scraper._aggregate_stocks({
+                'yahoo': [_stock('AAPL', score=0.9), _stock('MSFT')],
+                'finviz': finviz,
+            })
+
+        self.assertEqual([call.args[0] for call in score.call_args_list], ['AAPL'])
+        self.assertEqual([row['ticker'] for row in rows][0], 'AAPL')
+
+    def test_dropped_ticker_leaves_trending(self):
+        """Test a ticker missing from every source drops out of get_all_trending"""
+        payloads = {
+            'scrape_yahoo_batch': [[_stock('AAPL'), _stock('GME')], [_stock('AAPL')]],
+            'scrape_finviz_screener': [[_stock('GME')], []],
+            'scrape_coingecko_trending': [[], []],
+            'scrape_tradingview_ideas': [[], []],
+        }
+        for method, results in payloads.items():
+            setattr(self.scraper, method, Mock(side_effect=results))
+
+        with patch.object(stock_scraper, 'aiohttp', None):
+            first = self.scraper.get_all_trending()
+            second = self.scraper.get_all_trending()
+
+        self.assertEqual({row['ticker'] for row in first}, {'AAPL', 'GME'})
+        self.assertEqual([row['ticker'] for row in second], ['AAPL'])
+
+
+class TestScrapeCaching(unittest.TestCase):
+    """Test conditional GETs and failure caching in _scrape"""
+
+    def setUp(self):
+        self.scraper = StockScraper()
+        self.scraper.session = Mock()
+        self.parse = Mock(side_effect=lambda content: [_stock(content.decode())])
+        self.clock = patch.object(stock_scraper, 'time')
+        self.time = self.clock.start()
+        self.time.monotonic.return_value = 1000.0
+
+    def tearDown(self):
+        self.clock.stop()
+
+    def scrape(self):
+        return self.scraper._scrape('finviz', (FINVIZ_SCREENER_URL,), self.parse, "Finviz")
+
+    def expire(self):
+        self.time.monotonic.return_value += self.scraper._cache_ttl + 1
+
+    def test_not_modified_keeps_cached_rows(self):
+        """Test an all-304 revalidation returns the cached rows without reparsing"""
+        self.scraper.session.get.return_value = _response(200, b'AAPL', etag='v1')
+        rows = self.scrape()
+
+        self.expire()
+        self.scraper.session.get.return_value = _response(304)
+        self.assertIs(self.scrape(), rows)
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(self.scraper.session.get.call_args.kwargs['headers'], {'If-None-Match': 'v1'})
+
+    def test_ok_after_not_modified_replaces_rows(self):
+        """Test a 200 following a 304 replaces the cached rows"""
+        self.scraper.session.get.return_value = _response(200, b'AAPL', etag='v1')
+        self.scrape()
+        self.expire()
+        self.scraper.session.get.return_value = _response(304)
+        self.scrape()
+
+        self.expire()
+        self.scraper.session.get.return_value = _response(200, b'MSFT', etag='v2')
+        self.assertEqual([row['ticker'] for row in self.scrape()], ['MSFT'])
+        self.assertEqual(self.scraper._cache['finviz'][2], (('v2', None),))
+
+    def test_failure_cached_for_failure_ttl(self):
+        """Test a 429 or 5xx caches an empty result for exactly the failure TTL"""
+        for status in (429, 503):
+            with self.subTest(status=status):
+                self.scraper._cache.clear()
+                self.scraper.session.get.reset_mock()
+                self.scraper.session.get.return_value = _response(status)
+                self.assertEqual(self.scrape(), [])
+
+                self.time.monotonic.return_value += self.scraper._failure_ttl - 0.1
+                self.assertEqual(self.scrape(), [])
+                self.assertEqual(self.scraper.session.get.call_count, 1)
+
+                self.time.monotonic.return_value += 0.2
+                self.scraper.session.get.return_value = _response(200, b'AAPL')
+                self.assertEqual([row['ticker'] for row in self.scrape()], ['AAPL'])
+                self.assertEqual(self.scraper.session.get.call_count, 2)
+
+    def test_session_does_not_retry_status_codes(self):
+        """Test the adapter leaves 429/5xx to the failure cache instead of retrying"""
+        retries = StockScraper().session.get_adapter(FINVIZ_SCREENER_URL).max_retries
+        for status in (429, 500, 503):
+            with self.subTest(status=status):
+                self.assertFalse(retries.is_retry('GET', status, has_retry_after=True))
+        self.assertTrue(retries.connect)
+        self.assertTrue(retries.read)
+
+
+
+class TestYahooBatch(unittest.TestCase):
+    """Test the Yahoo quote API calls go through _scrape"""
+
+    TRENDING = json.dumps({'finance': {'result': [{'quotes': [{'symbol': 'AAPL'}]}]}}).encode()
+    QUOTES = json.dumps({'quoteResponse': {'result': [
+        {'symbol': 'AAPL', 'regularMarketPrice': 10.0, 'regularMarketChangePercent': 2.0},
+    ]}}).encode()
+
+    def setUp(self):
+        self.scraper = StockScraper()
+        self.scraper.session = Mock()
+        self.clock = patch.object(stock_scraper, 'time')
+        self.time = self.clock.start()
+        self.time.monotonic.return_value = 1000.0
+        for name in ('scrape_yahoo_trending', 'scrape_yahoo_gainers', 'scrape_yahoo_most_active'):
+            setattr(self.scraper, name, Mock(return_value=[_stock('HTML')]))
+
+    def tearDown(self):
+        self.clock.stop()
+
+    def respond(self, trending, quotes):
+        def get(url, **kwargs):
+            return trending if url == YAHOO_TRENDING_API_URL else quotes
+        self.scraper.session.get.side_effect = get
+
+    def test_not_modified_keeps_cached_quotes(self):
+        """Test a 304 from both API calls serves the cached quotes"""
+        self.respond(_response(200, self.TRENDING, etag='t1'), _response(200, self.QUOTES, etag='q1'))
+        rows = self.scraper.scrape_yahoo_batch()
+        self.assertIn('AAPL', {row['ticker'] for row in rows})
+
+        self.time.monotonic.return_value += self.scraper._cache_ttl + 1
+        self.respond(_response(304), _response(304))
+        self.assertIs(self.scraper.scrape_yahoo_batch(), rows)
+        headers = [call.kwargs['headers'] for call in self.scraper.session.get.call_args_list[2:]]
+        self.assertEqual(headers, [{'If-None-Match': 't1'}, {'If-None-Match': 'q1'}])
+
+    def test_api_failure_falls_back_and_backs_off(self):
+        """Test a throttled API falls back to HTML and is not retried within the failure TTL"""
+        self.respond(_response(429), _response(200, self.QUOTES))
+        self.assertEqual([row['ticker'] for row in self.scraper.scrape_yahoo_batch()], ['HTML'] * 3)
+
+        self.time.monotonic.return_value += self.scraper._failure_ttl - 0.1
+        self.scraper.scrape_yahoo_batch()
+        self.assertEqual(self.scraper.session.get.call_count, 1)
+
+        self.time.monotonic.return_value += 0.2
+        self.respond(_response(200, self.TRENDING), _response(200, self.QUOTES))
+        self.assertIn('AAPL', {row['ticker'] for row in self.scraper.scrape_yahoo_batch()})
+
+
+class TestAsyncTrendingRevalidation(unittest.TestCase):
+    """Test conditional GETs on the async get_all_trending path"""
+
+    def setUp(self):
+        self.scraper = StockScraper()
+        self.scraper._parse_finviz_screener = Mock(side_effect=lambda content: [_stock(content.decode())])
+        # Only Finviz is fetched; the other sources are fresh in the cache
+        for key in ('yahoo_batch', 'coingecko', 'tradingview'):
+            self.scraper._set_cache(key, [])
+        self.scraper._set_cache('finviz', [_stock('AAPL')], ttl=-1, validators=(('v1', None),))
+
+    def get_all_trending(self, status, body=b'', etag=None):
+        session = _FakeAsyncSession(lambda url: (status, body, etag))
+        fake_aiohttp = Mock()
+        fake_aiohttp.ClientSession.return_value = session
+        with patch.object(stock_scraper, 'aiohttp', fake_aiohttp):
+            rows = self.scraper.get_all_trending()
+        return session, rows
+
+    def test_not_modified_keeps_cached_rows(self):
+        """Test an all-304 refresh serves the cached rows"""
+        session, rows = self.get_all_trending(304)
+
+        self.assertEqual(session.requests, [(FINVIZ_SCREENER_URL, {'If-None-Match': 'v1'})])
+        self.assertEqual([row['ticker'] for row in rows], ['AAPL'])
+        self.scraper._parse_finviz_screener.assert_not_called()
+
+    def test_ok_after_not_modified_replaces_rows(self):
+        """Test a 200 after a 304 replaces the rows"""
+        self.get_all_trending(304)
+        self.scraper._set_cache('finviz', self.scraper._cache['finviz'][1], ttl=-1, validators=(('v1', None),))
+
+        _, rows = self.get_all_trending(200, b'MSFT', 'v2')
+        self.assertEqual([row['ticker'] for row in rows], ['MSFT'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,298 @@
+"""
+Tests for the SQLite trading state database
+"""
+
+import gc
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import warnings
+from unittest.mock import patch
+
+from tradingagents.services import trading_database
+from tradingagents.services.trading_database import TradingDatabase
+
+
+class TestTradingDatabase(unittest.TestCase):
+    """Test TradingDatabase persistence"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = TradingDatabase(os.path.join(self.tmpdir, "state.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_wal_enabled(self):
+        """Test the database file is switched to WAL"""
+        with self.db._get_connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_connection_reused_per_thread(self):
+        """Test each thread keeps one connection across calls"""
+        self.assertIs(self.db._conn(), self.db._conn())
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db._conn()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], self.db._conn())
+
+    def test_close_reconnects(self):
+        """Test the database is usable again after close()"""
+        self.db.save_trade("AAPL", "BUY", 10, price=150.0)
+        self.db.close()
+
+        trades = self.db.get_trades()
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]["symbol"], "AAPL")
+
+    def test_failed_write_rolls_back(self):
+        """Test an exception inside a queued write discards only its changes"""
+        def fail(conn):
+            conn.execute("INSERT INTO settings (key, value) VALUES ('k', '1')")
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.db._write(fail)
+        self.assertIsNone(self.db.get_setting("k"))
+
+        self.db.save_setting("k", 2)
+        self.assertEqual(self.db.get_setting("k"), 2)
+
+    def test_unopenable_database_raises(self):
+        """Test a path that cannot be opened fails the constructor instead of hanging"""
+        path = os.path.join(self.tmpdir, "isdir.db")
+        os.mkdir(path)
+        with self.assertRaises(sqlite3.OperationalError):
+            TradingDatabase(path)
+
+    def test_writer_death_fails_waiting_callers(self):
+        """Test a write that kills the writer thread raises and the next write recovers"""
+        class Crash(BaseException):
+            pass
+
+        def crash(conn):
+            raise Crash()
+
+        # The crash is expected to escape the writer thread
+        with patch.object(threading, "excepthook", lambda args: None):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.db._write(crash)
+            self.db._writer.join(timeout=5)
+
+        self.db.save_setting("k", 1)
+        self.assertEqual(self.db.get_setting("k"), 1)
+
+    def test_close_stops_writer(self):
+        """Test close() and leaving a with block stop the writer thread"""
+        writer = self.db._writer
+        self.db.close()
+        self.assertFalse(writer.is_alive())
+
+        with TradingDatabase(os.path.join(self.tmpdir, "ctx.db")) as db:
+            writer = db._writer
+            self.assertTrue(writer.is_alive())
+        self.assertFalse(writer.is_alive())
+
+    def test_dropped_instance_stops_writer(self):
+        """Test an instance dropped without close() does not leak its writer"""
+        db = TradingDatabase(os.path.join(self.tmpdir, "dropped.db"))
+        writer = db._writer
+        del db
+        gc.collect()
+        writer.join(timeout=5)
+        self.assertFalse(writer.is_alive())
+
+    def test_memory_database_concurrent_read_write(self):
+        """Test reads polling an in-memory database do not lock out the writer"""
+        db = TradingDatabase(":memory:")
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    db.get_trades(limit=50)
+                except sqlite3.Error as e:
+                    errors.append(e)
+                    return
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for _ in range(300):
+                db.save_trade("AAPL", "BUY", 1)
+        finally:
+            stop.set()
+            thread.join()
+            trades = db.get_trades(limit=1000)
+            db.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(trades), 300)
+
+    def test_read_connection_is_read_only(self):
+        """Test reads cannot write outside the writer thread"""
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db._get_connection() as conn:
+                conn.execute("INSERT INTO settings (key, value) VALUES ('k', '1')")
+
+    def test_concurrent_writers(self):
+        """Test writes from many threads all land through the writer thread"""
+        def worker(n):
+            for _ in range(10):
+                self.db.save_trade(f"SYM{n}", "BUY", 1)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.db.get_trades(limit=1000)), 80)
+
+    def test_save_trades_batch(self):
+        """Test a batch insert returns the ids of its rows in order"""
+        first = self.db.save_trade("MSFT", "SELL", 5)
+        ids = self.db.save_trades_batch([
+            {"symbol": "AAPL", "action": "BUY", "quantity": 10, "price": 150.0},
+            {"symbol": "TSLA", "action": "BUY", "quantity": 2, "metadata": {"leg": "tp"}},
+        ])
+
+        self.assertEqual(ids, [first + 1, first + 2])
+        by_id = {t["id"]: t for t in self.db.get_trades()}
+        self.assertEqual(by_id[ids[0]]["symbol"], "AAPL")
+        self.assertEqual(by_id[ids[1]]["order_type"], "MARKET")
+        self.assertEqual(by_id[ids[1]]["metadata"], {"leg": "tp"})
+        self.assertEqual(self.db.save_trades_batch([]), [])
+
+    def test_metadata_round_trips_as_dict(self):
+        """Test metadata dicts are stored as valid JSON and read back as dicts"""
+        self.db.save_position("AAPL", "BUY", 10, 100.0, metadata={"source": "signal", "score": 0.8})
+        self.assertEqual(self.db.get_position("AAPL")["metadata"], {"source": "signal", "score": 0.8})
+
+        self.db.save_trade("MSFT", "BUY", 1, metadata={})
+        self.assertIsNone(self.db.get_trades()[0]["metadata"])
+        with self.db._get_connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM trades WHERE metadata IS NULL").fetchone()[0]
+        self.assertEqual(stored, 1)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db._execute(
+                "INSERT INTO trades (symbol, action, quantity, metadata) VALUES ('X', 'BUY', 1, 'not json')"
+            )
+
+    def test_json_handling_is_not_process_global(self):
+        """Test the module leaves sqlite3's global adapters and converters alone"""
+        self.assertNotIn((dict, sqlite3.PrepareProtocol), sqlite3.adapters)
+        self.assertNotIn("JSON", sqlite3.converters)
+
+    def test_save_position_updates_open_row_in_place(self):
+        """Test re-saving an open position keeps its id and closed rows accumulate"""
+        first = self.db.save_position("AAPL", "BUY", 10, 100.0)
+        again = self.db.save_position("AAPL", "BUY", 15, 101.0, stop_loss_price=95.0)
+        self.assertEqual(first, again)
+        position = self.db.get_position("AAPL")
+        self.assertEqual(position["id"], first)
+        self.assertEqual(position["quantity"], 15)
+
+        self.db.close_position("AAPL", 110.0, pnl=135)
+        self.db.save_position("AAPL", "BUY", 5, 110.0)
+        self.db.close_position("AAPL", 112.0, pnl=10)
+        self.assertEqual(len(self.db.get_closed_positions()), 2)
+
+    def test_migrates_replace_constraint(self):
+        """Test a positions table with the old ON CONFLICT REPLACE rule is rebuilt"""
+        path = os.path.join(self.tmpdir, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE positions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL, action TEXT NOT NULL,
+                quantity REAL NOT NULL, entry_price REAL NOT NULL, entry_time TEXT NOT NULL,
+                market TEXT, broker TEXT, bracket_id TEXT, stop_loss_price REAL,
+                take_profit_price REAL, trailing_stop_pct REAL, status TEXT DEFAULT 'open',
+                exit_price REAL, exit_time TEXT, pnl REAL, pnl_pct REAL, metadata TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(symbol, status) ON CONFLICT REPLACE
+            )
+        """)
+        conn.execute(
+            "INSERT INTO positions (symbol, action, quantity, entry_price, entry_time) "
+            "VALUES ('AAPL', 'BUY', 10, 100.0, '2024-01-01T10:00:00')"
+        )
+        conn.commit()
+        conn.close()
+
+        db = TradingDatabase(path)
+        try:
+            position = db.get_position("AAPL")
+            self.assertEqual(position["quantity"], 10)
+            self.assertEqual(db.save_position("AAPL", "BUY", 20, 100.0), position["id"])
+            with db._get_connection() as conn:
+                schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'positions'").fetchone()[0]
+            self.assertNotIn("ON CONFLICT REPLACE", schema)
+        finally:
+            db.close()
+
+    def test_today_trades_range(self):
+        """Test today's trades come from an index range and skip older days"""
+        self.db.save_trade("AAPL", "BUY", 10)
+        self.db._execute(
+            "INSERT INTO trades (symbol, action, quantity, created_at) VALUES ('OLD', 'BUY', 1, '2000-01-01 12:00:00')"
+        )
+
+        self.assertEqual([t["symbol"] for t in self.db.get_today_trades()], ["AAPL"])
+        with self.db._get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM trades WHERE created_at >= ? AND created_at < ?",
+                self.db._today_bounds()
+            ).fetchall()
+        self.assertIn("idx_trades_created", plan[0][3])
+
+    def test_daily_stats_derived_from_closed_positions(self):
+        """Test daily stats are computed from the positions closed today"""
+        self.db.save_position("AAPL", "BUY", 10, 100.0)
+        self.db.close_position("AAPL", 105.0, pnl=50)
+        self.db.save_position("TSLA", "BUY", 2, 200.0)
+        self.db.close_position("TSLA", 190.0, pnl=-20)
+        self.db.save_position("MSFT", "BUY", 1, 300.0)
+
+        stats = self.db.get_daily_stats()
+        self.assertEqual(stats["trades_count"], 2)
+        self.assertEqual(stats["winning_trades"], 1)
+        self.assertEqual(stats["losing_trades"], 1)
+        self.assertEqual(stats["total_pnl"], 30)
+        self.assertEqual(stats["largest_win"], 50)
+        self.assertEqual(stats["largest_loss"], -20)
+        self.assertEqual(stats["volume_traded"], 10 * 100.0 + 2 * 200.0)
+        self.assertIsNone(self.db.get_daily_stats("2000-01-01"))
+
+    def test_update_trade_fields(self):
+        """Test update_trade writes only the fields it is given"""
+        trade_id = self.db.save_trade("AAPL", "BUY", 10)
+        self.assertFalse(self.db.update_trade(trade_id))
+        self.assertTrue(self.db.update_trade(trade_id, status="filled", fill_price=150.0))
+
+        trade = self.db.get_trades()[0]
+        self.assertEqual(trade["status"], "filled")
+        self.assertEqual(trade["fill_price"], 150.0)
+        self.assertIsNotNone(trade["fill_time"])
+        self.assertIsNone(trade["error"])
+
+    def test_update_daily_stats_deprecated(self):
+        """Test the legacy stats writer warns once per process"""
+        with patch.object(trading_database, "_update_daily_stats_warned", False):
+            with self.assertWarns(DeprecationWarning):
+                self.db.update_daily_stats(trades_count=1, pnl=50)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                self.db.update_daily_stats(trades_count=1, pnl=50)
+
+if __name__ == '__main__':
+    unittest.main()
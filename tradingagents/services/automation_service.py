@@ -254,8 +254,8 @@ class AutomationService:
                 market=market.value
             )
 
-            if not risk_check["allowed"]:
-                logger.warning(f"Trade blocked for {symbol}: {risk_check['reason']}")
+            if not risk_check.allowed:
+                logger.warning(f"Trade blocked for {symbol}: {risk_check.reason}")
                 return
 
             # Execute trade if auto-execute is enabled
@@ -2,13 +2,54 @@
 Risk limits and safety controls for automated trading
 """
 
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, List, Tuple
+from datetime import date as _date
+from collections import defaultdict, deque
+from types import MappingProxyType
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Seconds a global (order-independent) risk gate result is reused
+GLOBAL_GATES_TTL = 1.0
+
+def _today_key() -> int:
+    """Integer day bucket (proleptic ordinal of the local date) used to key daily tracking"""
+    return _date.today().toordinal()
+
+
+def _date_to_key(date_str: str) -> int:
+    """Convert an ISO date string to its integer day bucket"""
+    return _date.fromisoformat(date_str).toordinal()
+
+
+def _key_to_date(day_key: int) -> str:
+    """Convert an integer day bucket back to an ISO date string"""
+    return _date.fromordinal(day_key).isoformat()
+
+
+@dataclass(frozen=True, slots=True)
+class TradeDecision:
+    """Result of a risk check"""
+    allowed: bool
+    reason: str
+    limit_type: str = ""
+    position_size: float = 0.0
+    concentration: float = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        """Allow dict-style access (decision["allowed"]) for existing callers"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+
+# Shared decision returned whenever every check passes
+_ALLOWED = TradeDecision(True, "All risk checks passed")
+
 
 class RiskLimits:
     """Manage risk limits and safety controls"""
@@ -20,7 +61,8 @@ class RiskLimits:
         max_daily_loss: float = 0.05,  # 5% max daily loss
         max_portfolio_risk: float = 0.2,  # 20% max portfolio at risk
         max_concentration: float = 0.3,  # 30% max concentration in single market
-        min_balance_required: float = 0.1  # 10% minimum balance to keep
+        min_balance_required: float = 0.1,  # 10% minimum balance to keep
+        max_lookback_days: int = 30  # days of P&L kept for portfolio risk
     ):
         """
         Initialize risk limits
@@ -32,6 +74,7 @@ class RiskLimits:
             max_portfolio_risk: Maximum portfolio at risk
             max_concentration: Maximum concentration in single market
             min_balance_required: Minimum balance to keep as fraction
+            max_lookback_days: Number of most recent days of P&L kept
         """
         self.max_position_size = max_position_size
         self.max_daily_trades = max_daily_trades
@@ -39,13 +82,32 @@ class RiskLimits:
         self.max_portfolio_risk = max_portfolio_risk
         self.max_concentration = max_concentration
         self.min_balance_required = min_balance_required
+        self._available_fraction = 1.0 - min_balance_required
+        self.max_lookback_days = max_lookback_days
 
         # Track daily activity
-        self.daily_trades: Dict[str, int] = defaultdict(int)  # date -> count
-        self.daily_pnl: Dict[str, float] = defaultdict(float)  # date -> PnL
+        self.daily_trades: Dict[int, int] = {}  # day key -> count
+        # Bounded ring of [day key, PnL] entries, indexed by day key, plus the
+        # running sum of losses across the ring
+        self._pnl_ring: Deque[List] = deque(maxlen=max_lookback_days or 30)
+        self._pnl_index: Dict[int, List] = {}
+        self._negative_pnl_total = 0.0
         self.positions: Dict[str, Dict] = {}  # symbol -> position info
         self.market_exposure: Dict[str, float] = defaultdict(float)  # market -> exposure
 
+        # (key, timestamp, result) of the last global gate check
+        self._global_gates_cache: Optional[Tuple[Tuple, float, Optional[TradeDecision]]] = None
+
+    @property
+    def daily_pnl(self) -> Dict[int, float]:
+        """P&L per day key for the days still kept in the ring"""
+        return {day_key: pnl for day_key, pnl in self._pnl_ring}
+
+    def _pnl_for_day(self, day_key: int) -> float:
+        """Get recorded P&L for a day key (0 if none)"""
+        entry = self._pnl_index.get(day_key)
+        return entry[1] if entry is not None else 0.0
+
     def can_trade(
         self,
         symbol: str,
@@ -54,7 +116,7 @@ class RiskLimits:
         price: float,
         portfolio_value: float,
         market: str
-    ) -> Dict:
+    ) -> TradeDecision:
         """
         Check if trade is allowed based on risk limits
 
@@ -67,69 +129,146 @@ class RiskLimits:
             market: Market type
 
         Returns:
-            Dict with allowed flag and reason
+            TradeDecision with allowed flag and reason
+        """
+        if portfolio_value <= 0:
+            return TradeDecision(
+                False,
+                "Invalid portfolio value",
+                "invalid"
+            )
+
+        # Cheap gates run first, in the original precedence; the cached
+        # global gates (portfolio risk, then the VIX fetch) run last
+        today = _today_key()
+        rejection = self._check_daily_gates(today, self.daily_trades.get(today, 0), portfolio_value)
+        if rejection is not None:
+            return rejection
+
+        decision = self._check_order_gates(symbol, action, quantity, price, portfolio_value, market)
+        if not decision.allowed:
+            return decision
+
+        return self._cached_global_gates(today, market, portfolio_value) or decision
+
+    def can_trade_many(self, orders: List[Dict], portfolio_value: float) -> List[TradeDecision]:
         """
-        today = datetime.now().date().isoformat()
+        Check a basket of orders against risk limits
 
-        # Check daily trade limit
-        if self.daily_trades[today] >= self.max_daily_trades:
-            return {
-                "allowed": False,
-                "reason": f"Daily trade limit reached ({self.max_daily_trades})",
-                "limit_type": "daily_trades"
-            }
+        Global gates (including the VIX fetch) run at most once per market,
+        and only for orders that pass the per-order gates. Orders allowed
+        earlier in the basket count towards the daily trade limit and market
+        exposure seen by later ones. Nothing is recorded; call record_trade after execution.
 
-        # Check daily loss limit
-        daily_loss = abs(self.daily_pnl[today]) if self.daily_pnl[today] < 0 else 0
-        if daily_loss >= portfolio_value * self.max_daily_loss:
-            return {
-                "allowed": False,
-                "reason": f"Daily loss limit reached ({self.max_daily_loss * 100}%)",
-                "limit_type": "daily_loss"
-            }
+        Args:
+            orders: Dicts with symbol, action, quantity, price and market keys
+            portfolio_value: Total portfolio value
 
-        # Check position size limit
-        trade_value = quantity * price
-        position_size = trade_value / portfolio_value if portfolio_value > 0 else 0
+        Returns:
+            One TradeDecision per order, in the same order
+        """
+        if portfolio_value <= 0:
+            invalid = TradeDecision(False, "Invalid portfolio value", "invalid")
+            return [invalid] * len(orders)
+
+        today = _today_key()
+        trades_today = self.daily_trades.get(today, 0)
+        global_gates: Dict[str, Optional[TradeDecision]] = {}
+        exposure = dict(self.market_exposure)
+        decisions: List[TradeDecision] = []
+
+        for order in orders:
+            rejection = self._check_daily_gates(today, trades_today, portfolio_value)
+            if rejection is not None:
+                decisions.append(rejection)
+                continue
+
+            market = order["market"]
+            action = order["action"]
+            quantity = order["quantity"]
+            price = order["price"]
+            decision = self._check_order_gates(
+                order["symbol"], action, quantity, price, portfolio_value, market,
+                current_exposure=exposure.get(market, 0)
+            )
+            if decision.allowed:
+                if market not in global_gates:
+                    global_gates[market] = self._cached_global_gates(today, market, portfolio_value)
+                decision = global_gates[market] or decision
+            if decision.allowed:
+                trades_today += 1
+                trade_value = quantity * price
+                exposure[market] = exposure.get(market, 0) + (trade_value if action == "BUY" else -trade_value)
+            decisions.append(decision)
+
+        return decisions
+
+    def _cached_global_gates(self, today: int, market: str, portfolio_value: float) -> Optional[TradeDecision]:
+        """
+        Memoized wrapper around _check_global_gates
 
-        if position_size > self.max_position_size:
-            return {
-                "allowed": False,
-                "reason": f"Position size exceeds limit ({self.max_position_size * 100}%)",
-                "limit_type": "position_size",
-                "position_size": position_size
-            }
+        The result is reused for GLOBAL_GATES_TTL seconds for the same
+        (day, market, portfolio value). Any recorded trade, P&L or limit
+        change invalidates it.
+        """
+        key = (today, market, portfolio_value)
+        now = time.monotonic()
+        cached = self._global_gates_cache
+        if cached is not None and cached[0] == key and now - cached[1] < GLOBAL_GATES_TTL:
+            return cached[2]
 
-        # Check minimum balance
-        available_balance = portfolio_value * (1 - self.min_balance_required)
-        if action == "BUY" and trade_value > available_balance:
-            return {
-                "allowed": False,
-                "reason": f"Insufficient balance (must keep {self.min_balance_required * 100}% reserve)",
-                "limit_type": "balance"
-            }
+        result = self._check_global_gates(market, portfolio_value)
+        self._global_gates_cache = (key, now, result)
+        return result
 
-        # Check market concentration
-        current_exposure = self.market_exposure.get(market, 0)
-        new_exposure = current_exposure + (trade_value if action == "BUY" else -trade_value)
-        concentration = new_exposure / portfolio_value if portfolio_value > 0 else 0
+    def _check_daily_gates(self, today: int, trades_today: int, portfolio_value: float) -> Optional[TradeDecision]:
+        """
+        Check the daily trade and loss limits
+
+        trades_today is passed in so basket checks can count orders
+        allowed earlier in the basket.
+
+        Returns:
+            Rejecting TradeDecision, or None if both gates pass
+        """
+        max_daily_trades = self.max_daily_trades
+        max_daily_loss = self.max_daily_loss
+        # Check daily trade limit
+        if trades_today >= max_daily_trades:
+            return TradeDecision(
+                False,
+                f"Daily trade limit reached ({max_daily_trades})",
+                "daily_trades"
+            )
 
-        if concentration > self.max_concentration:
-            return {
-                "allowed": False,
-                "reason": f"Market concentration limit exceeded ({self.max_concentration * 100}%)",
-                "limit_type": "concentration",
-                "concentration": concentration
-            }
+        # Check daily loss limit
+        pnl_today = self._pnl_for_day(today)
+        daily_loss = -pnl_today if pnl_today < 0 else 0
+        if daily_loss >= portfolio_value * max_daily_loss:
+            return TradeDecision(
+                False,
+                f"Daily loss limit reached ({max_daily_loss * 100}%)",
+                "daily_loss"
+            )
+
+        return None
+
+    def _check_global_gates(self, market: str, portfolio_value: float) -> Optional[TradeDecision]:
+        """
+        Check the portfolio risk limit and the VIX circuit breaker
 
+        Returns:
+            Rejecting TradeDecision, or None if all global gates pass
+        """
+        max_portfolio_risk = self.max_portfolio_risk
         # Check portfolio risk
-        total_risk = sum(abs(pnl) for pnl in self.daily_pnl.values() if pnl < 0)
-        if total_risk >= portfolio_value * self.max_portfolio_risk:
-            return {
-                "allowed": False,
-                "reason": f"Portfolio risk limit reached ({self.max_portfolio_risk * 100}%)",
-                "limit_type": "portfolio_risk"
-            }
+        total_risk = self._negative_pnl_total
+        if total_risk >= portfolio_value * max_portfolio_risk:
+            return TradeDecision(
+                False,
+                f"Portfolio risk limit reached ({max_portfolio_risk * 100}%)",
+                "portfolio_risk"
+            )
 
         # Circuit Breaker: Volatility Check (VIX)
         # We fetch VIX here. Ideally this should be cached or passed in context.
@@ -144,18 +283,71 @@ class RiskLimits:
                     current_vix = vix["Close"].iloc[-1]
                     # VIX > 35 is usually considered potential crash/panic territory
                     if current_vix > 35:
-                        return {
-                            "allowed": False,
-                            "reason": f"Circuit Breaker Active: High Volatility (VIX: {current_vix:.2f})",
-                            "limit_type": "circuit_breaker"
-                        }
+                        return TradeDecision(
+                            False,
+                            f"Circuit Breaker Active: High Volatility (VIX: {current_vix:.2f})",
+                            "circuit_breaker"
+                        )
         except Exception as e:
-            logger.warning(f"Failed to check VIX: {e}")
+            logger.warning("Failed to check VIX: %s", e)
 
-        return {
-            "allowed": True,
-            "reason": "All risk checks passed"
-        }
+        return None
+
+    def _check_order_gates(
+        self,
+        symbol: str,
+        action: str,
+        quantity: float,
+        price: float,
+        portfolio_value: float,
+        market: str,
+        current_exposure: Optional[float] = None
+    ) -> TradeDecision:
+        """
+        Check limits that depend on the individual order
+
+        portfolio_value must be positive. current_exposure overrides the
+        tracked exposure for the market (used for staged basket checks).
+        """
+        max_position_size = self.max_position_size
+        max_concentration = self.max_concentration
+
+        # Check position size limit
+        trade_value = quantity * price
+        position_size = trade_value / portfolio_value
+
+        if position_size > max_position_size:
+            return TradeDecision(
+                False,
+                f"Position size exceeds limit ({max_position_size * 100}%)",
+                "position_size",
+                position_size=position_size
+            )
+
+        # Check minimum balance
+        available_balance = portfolio_value * self._available_fraction
+        if action == "BUY" and trade_value > available_balance:
+            return TradeDecision(
+                False,
+                f"Insufficient balance (must keep {self.min_balance_required * 100}% reserve)",
+                "balance"
+            )
+
+        # Check market concentration
+        if current_exposure is None:
+            current_exposure = self.market_exposure.get(market, 0)
+        new_exposure = current_exposure + (trade_value if action == "BUY" else -trade_value)
+        concentration = new_exposure / portfolio_value
+
+        if concentration > max_concentration:
+            return TradeDecision(
+                False,
+                f"Market concentration limit exceeded ({max_concentration * 100}%)",
+                "concentration",
+                concentration=concentration
+            )
+
+        return _ALLOWED
 
     def record_trade(
         self,
@@ -166,8 +358,9 @@ class RiskLimits:
         market: str
     ):
         """Record a trade for risk tracking"""
-        today = datetime.now().date().isoformat()
-        self.daily_trades[today] += 1
+        self._global_gates_cache = None
+        today = _today_key()
+        self.daily_trades[today] = self.daily_trades.get(today, 0) + 1
 
         trade_value = quantity * price
 
@@ -193,48 +386,93 @@ class RiskLimits:
                 }
 
     def record_pnl(self, pnl: float, date: Optional[str] = None):
-        """Record P&L for a date"""
-        if date is None:
-            date = datetime.now().date().isoformat()
-        self.daily_pnl[date] += pnl
+        """Record P&L for a date (ISO string, defaults to today)"""
+        self._global_gates_cache = None
+        day_key = _today_key() if date is None else _date_to_key(date)
+
+        entry = self._pnl_index.get(day_key)
+        if entry is None:
+            ring = self._pnl_ring
+            if len(ring) == ring.maxlen:
+                # Oldest day is about to rotate out of the ring
+                evicted_day, evicted_pnl = ring[0]
+                del self._pnl_index[evicted_day]
+                if evicted_pnl < 0:
+                    self._negative_pnl_total += evicted_pnl
+            entry = [day_key, 0.0]
+            ring.append(entry)
+            self._pnl_index[day_key] = entry
+
+        old_pnl = entry[1]
+        new_pnl = old_pnl + pnl
+        entry[1] = new_pnl
+        self._negative_pnl_total += (-new_pnl if new_pnl < 0 else 0.0) - (-old_pnl if old_pnl < 0 else 0.0)
 
     def reset_daily_counts(self):
         """Reset daily tracking (call at start of new day)"""
-        today = datetime.now().date().isoformat()
+        self._global_gates_cache = None
+        today = _today_key()
         # Keep only today's data
         self.daily_trades = {today: self.daily_trades.get(today, 0)}
-        self.daily_pnl = {today: self.daily_pnl.get(today, 0)}
+
+        entry = self._pnl_index.get(today)
+        self._pnl_ring.clear()
+        self._pnl_index.clear()
+        self._negative_pnl_total = 0.0
+        if entry is not None:
+            self._pnl_ring.append(entry)
+            self._pnl_index[today] = entry
+            self._negative_pnl_total = -entry[1] if entry[1] < 0 else 0.0
 
     def get_risk_summary(self, portfolio_value: float) -> Dict:
-        """Get current risk summary"""
-        today = datetime.now().date().isoformat()
+        """
+        Get current risk summary
+
+        "market_exposure" is a read-only live view of the tracked exposure,
+        not a copy; convert it with dict() before serializing or keeping it.
+        """
+        today = _today_key()
+        pnl_today = self._pnl_for_day(today)
+        total_exposure = sum(self.market_exposure.values())
+        # Percentages are reported as 0 for a non-positive portfolio value
+        percent_scale = 100.0 / portfolio_value if portfolio_value > 0 else 0.0
 
         return {
+            "date": _key_to_date(today),
             "daily_trades": self.daily_trades.get(today, 0),
             "max_daily_trades": self.max_daily_trades,
-            "daily_pnl": self.daily_pnl.get(today, 0),
-            "daily_pnl_percent": (self.daily_pnl.get(today, 0) / portfolio_value * 100) if portfolio_value > 0 else 0,
+            "daily_pnl": pnl_today,
+            "daily_pnl_percent": pnl_today * percent_scale,
             "max_daily_loss": self.max_daily_loss * 100,
-            "market_exposure": dict(self.market_exposure),
+            "market_exposure": MappingProxyType(self.market_exposure),
             "positions_count": len(self.positions),
-            "total_exposure": sum(self.market_exposure.values()),
-            "exposure_percent": (sum(self.market_exposure.values()) / portfolio_value * 100) if portfolio_value > 0 else 0
+            "total_exposure": total_exposure,
+            "exposure_percent": total_exposure * percent_scale
         }
 
     def update_limits(self, **kwargs):
         """Update risk limits"""
-        if "max_position_size" in kwargs:
-            self.max_position_size = float(kwargs["max_position_size"])
-        if "max_daily_trades" in kwargs:
-            self.max_daily_trades = int(kwargs["max_daily_trades"])
-        if "max_daily_loss" in kwargs:
-            self.max_daily_loss = float(kwargs["max_daily_loss"])
-        if "max_portfolio_risk" in kwargs:
-            self.max_portfolio_risk = float(kwargs["max_portfolio_risk"])
-        if "max_concentration" in kwargs:
-            self.max_concentration = float(kwargs["max_concentration"])
-        if "min_balance_required" in kwargs:
-            self.min_balance_required = float(kwargs["min_balance_required"])
+        self._global_gates_cache = None
+        for key, value in kwargs.items():
+            setter = _LIMIT_SETTERS.get(key)
+            if setter is not None:
+                setter(self, value)
+
+
+def _set_min_balance_required(limits: RiskLimits, value) -> None:
+    limits.min_balance_required = float(value)
+    limits._available_fraction = 1.0 - limits.min_balance_required
+
+
+# update_limits keyword -> setter applying the value with its type coercion
+_LIMIT_SETTERS = {
+    "max_position_size": lambda limits, v: setattr(limits, "max_position_size", float(v)),
+    "max_daily_trades": lambda limits, v: setattr(limits, "max_daily_trades", int(v)),
+    "max_daily_loss": lambda limits, v: setattr(limits, "max_daily_loss", float(v)),
+    "max_portfolio_risk": lambda limits, v: setattr(limits, "max_portfolio_risk", float(v)),
+    "max_concentration": lambda limits, v: setattr(limits, "max_concentration", float(v)),
+    "min_balance_required": _set_min_balance_required,
+}
 
 
 def create_risk_limits(config: Dict) -> RiskLimits:
@@ -253,5 +491,6 @@ def create_risk_limits(config: Dict) -> RiskLimits:
         max_daily_loss=config.get("max_daily_loss", 0.05),
         max_portfolio_risk=config.get("max_portfolio_risk", 0.2),
         max_concentration=config.get("max_concentration", 0.3),
-        min_balance_required=config.get("min_balance_required", 0.1)
+        min_balance_required=config.get("min_balance_required", 0.1),
+        max_lookback_days=config.get("max_lookback_days", 30)
     )
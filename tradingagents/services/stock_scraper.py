@@ -6,12 +6,33 @@ No hardcoding - all data is live!
 
 import logging
 import requests
+import lxml.html
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
+from datetime import datetime
+from urllib.parse import urlencode
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import threading
+import io
 import re
 import json
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +43,78 @@ HEADERS = {
     'Accept-Language': 'en-US,en;q=0.5',
 }
 
+YAHOO_TRENDING_API_URL = "https://query1.finance.yahoo.com/v1/finance/trending/US?count=25"
+YAHOO_QUOTE_API_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+YAHOO_TRENDING_URL = "https://finance.yahoo.com/trending-tickers"
+YAHOO_GAINERS_URL = "https://finance.yahoo.com/gainers"
+YAHOO_MOST_ACTIVE_URL = "https://finance.yahoo.com/most-active"
+# Finviz screener: unusual volume + price above SMA20
+FINVIZ_SCREENER_URL = "https://finviz.com/screener.ashx?v=111&f=sh_avgvol_o500,sh_relvol_o1.5,ta_sma20_pa&ft=4"
+# CoinGecko trending search, plus top movers by volume
+COINGECKO_URLS = (
+    "https://api.coingecko.com/api/v3/search/trending",
+    "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=volume_desc&per_page=10",
+)
+TRADINGVIEW_IDEAS_URL = "https://www.tradingview.com/ideas/stocks/"
+NSE_HOME_URL = "https://www.nseindia.com/"
+
+# (source name, scraper method) fetched by get_all_trending; each method
+# has an "<name>_async" variant taking an aiohttp session
+_TRENDING_SOURCES = (
+    ('yahoo', 'scrape_yahoo_batch'),
+    ('finviz', 'scrape_finviz_screener'),
+    ('coingecko', 'scrape_coingecko_trending'),
+    ('tradingview', 'scrape_tradingview_ideas'),
+)
+
+# Precompiled XPaths: all rows of a table, all rows of the Finviz screener
+# results table, the cells of a row, and a cell's whitespace-normalized text
+_TABLE_ROWS = etree.XPath('.//tr')
+_FINVIZ_TABLE_ROWS = etree.XPath("(//table[contains(concat(' ', normalize-space(@class), ' '), ' table-light ')])[1]//tr")
+_ROW_CELLS = etree.XPath('./td')
+_CELL_TEXT = etree.XPath('normalize-space(.)')
+
+# Common words and WSB slang that look like tickers
+_STOP_TICKERS = frozenset({
+    'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HAD', 'HER', 'WAS', 'ONE', 'OUR',
+    'OUT', 'HAS', 'HIS', 'HOW', 'MAN', 'NEW', 'NOW', 'OLD', 'SEE', 'WAY', 'WHO', 'BOY', 'DID', 'GET',
+    'HIM', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE', 'WSB', 'DD', 'IMO', 'YOLO', 'FD', 'OTM', 'ITM',
+    'ATM', 'EOD', 'EOW', 'IV', 'DTE',
+})
+
+# Ticker mentions: 2-5 capital letters, optionally prefixed with $; stop
+# words are rejected by a lookahead so the regex engine never yields them
+_STOP_PATTERN = '|'.join(sorted(_STOP_TICKERS, key=lambda word: (-len(word), word)))
+_TICKER_RE = re.compile(rf'\$?\b(?!(?:{_STOP_PATTERN})\b)([A-Z]{{2,5}})\b')
+
+# TradingView idea card CSS selectors (soupsieve caches the compiled form)
+_SEL_IDEA_CARD = 'div[class*="idea-card"]'
+_SEL_SYMBOL = 'a[class*="symbol"]'
+_SEL_TYPE = 'span[class*="type"]'
+
+# Translation table deleting currency symbols, separators and signs from numbers
+_NUM_TRANSLATE = str.maketrans('', '', ',$€£₹%+')
+
+
+def _failure_status(statuses) -> int:
+    """First rate-limited (429) or server-error (5xx) status, or 0 if none"""
+    return next((status for status in statuses if status == 429 or status >= 500), 0)
+
+
+def _first_table_cells(content: bytes, start: int, stop: int) -> List[List[str]]:
+    """
+    Get cell texts for rows[start:stop] of the first table in an HTML page
+    
+    The page is stream-parsed and parsing stops once the first table has
+    been read, so the rest of the document is never built.
+    """
+    context = etree.iterparse(io.BytesIO(content), events=('end',), tag='table', html=True, recover=True)
+    for _, table in context:
+        cells = [[_CELL_TEXT(td) for td in _ROW_CELLS(row)] for row in _TABLE_ROWS(table)[start:stop]]
+        table.clear()
+        return cells
+    return []
+
 
 class StockScraper:
     """Scrapes trending stocks from multiple real sources"""
@@ -30,345 +123,599 @@ class StockScraper:
         self.config = config or {}
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
+        # Pool sized for the parallel scrapers so same-host requests reuse
+        # connections instead of racing separate TCP/TLS handshakes. Only
+        # connection and read errors are retried; 429/5xx responses go back
+        # to _scrape, which caches the failure instead of hammering the host
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2, connect=2, read=2, status=0, backoff_factor=0.3,
+                respect_retry_after_header=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.timeout = 15
         
-        # Cache
-        self._cache = {}
-        self._cache_time = {}
-        self._cache_duration = timedelta(minutes=10)
+        # Cache: key -> (expires_at on the monotonic clock, data, per-url
+        # (ETag, Last-Modified) validators used to revalidate stale data)
+        self._cache: Dict[str, Tuple[float, List, Tuple]] = {}
+        self._cache_ttl = 600.0
+        # Failures are cached as empty results for a short while so repeated
+        # polling backs off instead of hammering a throttled or broken source
+        self._failure_ttl = 60.0
+        # Quote API url of the cached 'yahoo_quotes' entry; its validators
+        # only apply while the trending symbol list is unchanged
+        self._yahoo_quote_url: Optional[str] = None
+        
+        # Incremental aggregation index: the last result list of each source,
+        # its per-ticker partial sums, and the ranked row of every ticker.
+        # Sources served from cache return the same list object, so only
+        # tickers touched by a changed source are re-scored.
+        self._source_results: Dict[str, List[Dict]] = {}
+        self._source_partials: Dict[str, Dict[str, Dict]] = {}
+        self._ranked_rows: Dict[str, Dict] = {}
+        self._ranked: List[Dict] = []
+        self._dirty: set = set()
+        self._index_lock = threading.Lock()
     
     def get_all_trending(self) -> List[Dict]:
         """
         Get trending stocks from all sources
         
+        Sources are fetched concurrently on an asyncio event loop when
+        aiohttp is installed, otherwise on a thread pool.
+        
         Returns:
             List of trending stocks with source and metrics
         """
-        all_stocks = []
+        if aiohttp is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self._async_get_all_trending())
+        
+        results = {}
         
         # Scrape all sources in parallel
-        with ThreadPoolExecutor(max_workers=6) as executor:
+        with ThreadPoolExecutor(max_workers=len(_TRENDING_SOURCES)) as executor:
             futures = {
-                executor.submit(self.scrape_yahoo_trending): 'yahoo_trending',
-                executor.submit(self.scrape_yahoo_gainers): 'yahoo_gainers',
-                executor.submit(self.scrape_yahoo_most_active): 'yahoo_active',
-                executor.submit(self.scrape_finviz_screener): 'finviz',
-                executor.submit(self.scrape_coingecko_trending): 'coingecko',
-                executor.submit(self.scrape_tradingview_ideas): 'tradingview',
+                executor.submit(getattr(self, method)): source
+                for source, method in _TRENDING_SOURCES
             }
             
             for future in as_completed(futures, timeout=30):
                 source = futures[future]
                 try:
                     result = future.result()
-                    all_stocks.extend(result)
+                    results[source] = result
                     logger.info(f"✅ {source}: Found {len(result)} stocks")
                 except Exception as e:
                     logger.error(f"❌ {source} failed: {e}")
         
         # Aggregate and rank
-        return self._aggregate_stocks(all_stocks)
+        return self._aggregate_stocks(results)
     
-    def scrape_yahoo_trending(self) -> List[Dict]:
-        """Scrape Yahoo Finance trending tickers"""
-        stocks = []
-        cache_key = 'yahoo_trending'
+    async def _async_get_all_trending(self) -> List[Dict]:
+        """Fetch all trending sources on one event loop and aggregate them"""
+        connector = aiohttp.TCPConnector(limit=16, limit_per_host=4)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
+        async with aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(getattr(self, f"{method}_async")(session) for _, method in _TRENDING_SOURCES),
+                return_exceptions=True
+            )
+        
+        source_results = {}
+        for (source, _), result in zip(_TRENDING_SOURCES, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ {source} failed: {result}")
+                continue
+            source_results[source] = result
+            logger.info(f"✅ {source}: Found {len(result)} stocks")
         
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
+        # Aggregate and rank
+        return self._aggregate_stocks(source_results)
+    
+    def _scrape(self, cache_key: str, urls: Tuple[str, ...], parse: Callable[..., List[Dict]], label: str) -> List[Dict]:
+        """
+        Fetch urls with the shared session and parse the bodies, with caching
+        
+        Multiple urls are fetched concurrently and passed to parse in order.
+        Stale entries are revalidated with conditional GETs; if every url
+        answers 304 Not Modified the cached data is kept without reparsing.
+        Errors, 429s and 5xx responses are logged and produce an empty list,
+        which is cached for self._failure_ttl seconds.
+        """
+        entry = self._cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
         
         try:
-            url = "https://finance.yahoo.com/trending-tickers"
-            response = self.session.get(url, timeout=self.timeout)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            validators = self._stale_validators(entry, urls)
+            responses = self._get_all(urls, [self._conditional_headers(v) for v in validators])
             
-            # Find trending table
-            table = soup.find('table')
-            if table:
-                rows = table.find_all('tr')[1:]  # Skip header
-                
-                for row in rows[:20]:
-                    cols = row.find_all('td')
-                    if len(cols) >= 5:
-                        ticker = cols[0].get_text(strip=True)
-                        name = cols[1].get_text(strip=True)
-                        price = self._parse_number(cols[2].get_text(strip=True))
-                        change = self._parse_number(cols[3].get_text(strip=True))
-                        change_pct = self._parse_number(cols[4].get_text(strip=True).replace('%', ''))
-                        
-                        if ticker and len(ticker) <= 5:
-                            stocks.append({
-                                'ticker': ticker,
-                                'name': name,
-                                'price': price,
-                                'change': change,
-                                'change_pct': change_pct,
-                                'source': 'yahoo_trending',
-                                'sentiment': 0.6 if change_pct > 0 else 0.4,
-                                'score': abs(change_pct) / 10  # Higher change = higher score
-                            })
+            if entry is not None and all(r.status_code == 304 for r in responses):
+                self._set_cache(cache_key, entry[1], validators=validators)
+                return entry[1]
             
-            self._set_cache(cache_key, stocks)
+            # A partial 304 still needs the full body of the unchanged url
+            responses = [
+                self.session.get(url, timeout=self.timeout) if r.status_code == 304 else r
+                for url, r in zip(urls, responses)
+            ]
+            
+            status = _failure_status(r.status_code for r in responses)
+            if status:
+                return self._cache_failure(cache_key, label, f"HTTP {status}")
+            
+            stocks = parse(*(r.content for r in responses))
+            self._set_cache(cache_key, stocks, validators=tuple(
+                (r.headers.get('ETag'), r.headers.get('Last-Modified')) for r in responses
+            ))
+            return stocks
+            
+        except Exception as e:
+            return self._cache_failure(cache_key, label, e)
+    
+    def _get_all(self, urls: Tuple[str, ...], headers: List[Dict[str, str]]) -> List[requests.Response]:
+        """GET each url with its headers, concurrently when there is more than one"""
+        if len(urls) == 1:
+            return [self.session.get(urls[0], headers=headers[0], timeout=self.timeout)]
+        
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            futures = [
+                executor.submit(self.session.get, url, headers=url_headers, timeout=self.timeout)
+                for url, url_headers in zip(urls, headers)
+            ]
+            return [future.result() for future in futures]
+    
+    async def _scrape_async(self, session: "aiohttp.ClientSession", cache_key: str, urls: Tuple[str, ...],
+                            parse: Callable[..., List[Dict]], label: str) -> List[Dict]:
+        """Async counterpart of _scrape using an aiohttp session"""
+        entry = self._cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        async def fetch(url: str, headers: Dict[str, str]) -> Tuple[int, Tuple[Optional[str], Optional[str]], bytes]:
+            async with session.get(url, headers=headers) as response:
+                validator = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return response.status, validator, await response.read()
+        
+        try:
+            validators = self._stale_validators(entry, urls)
+            results = await asyncio.gather(*(
+                fetch(url, self._conditional_headers(v)) for url, v in zip(urls, validators)
+            ))
+            
+            if entry is not None and all(status == 304 for status, _, _ in results):
+                self._set_cache(cache_key, entry[1], validators=validators)
+                return entry[1]
+            
+            # A partial 304 still needs the full body of the unchanged url
+            results = [
+                await fetch(url, {}) if result[0] == 304 else result
+                for url, result in zip(urls, results)
+            ]
+            
+            status = _failure_status(result[0] for result in results)
+            if status:
+                return self._cache_failure(cache_key, label, f"HTTP {status}")
+            
+            stocks = parse(*(body for _, _, body in results))
+            self._set_cache(cache_key, stocks, validators=tuple(validator for _, validator, _ in results))
+            return stocks
             
         except Exception as e:
-            logger.error(f"Yahoo trending error: {e}")
+            return self._cache_failure(cache_key, label, e)
+    
+    def _cache_failure(self, cache_key: str, label: str, error) -> List[Dict]:
+        """Log a failed scrape and cache an empty result for self._failure_ttl seconds"""
+        logger.error(f"{label} error: {error}")
+        self._set_cache(cache_key, [], ttl=self._failure_ttl)
+        return []
+    
+    @staticmethod
+    def _stale_validators(entry: Optional[Tuple], urls: Tuple[str, ...]) -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
+        """Per-url (ETag, Last-Modified) stored with a cache entry, or empty validators"""
+        if entry is not None and len(entry[2]) == len(urls):
+            return entry[2]
+        return ((None, None),) * len(urls)
+    
+    @staticmethod
+    def _conditional_headers(validator: Tuple[Optional[str], Optional[str]]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from stored validators"""
+        etag, last_modified = validator
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    def scrape_yahoo_batch(self) -> List[Dict]:
+        """
+        Get Yahoo Finance trending, gainers and most active stocks in one batch
+        
+        Fetches the trending symbol list and then all their quotes from
+        Yahoo's JSON API (two requests, no HTML), both through _scrape so
+        they are revalidated and back off like the other sources. Falls
+        back to scraping the three HTML pages if the API is unavailable.
+        """
+        cache_key = 'yahoo_batch'
+        
+        if self._is_cached(cache_key):
+            return self._cache[cache_key][1]
+        
+        symbols = self._scrape('yahoo_trending_api', (YAHOO_TRENDING_API_URL,),
+                               self._parse_yahoo_trending_symbols, "Yahoo trending API")
+        if symbols:
+            stocks = self._scrape('yahoo_quotes', (self._yahoo_quotes_url(symbols),),
+                                  self._parse_yahoo_quotes, "Yahoo quote API")
+            if stocks:
+                return stocks
+        
+        logger.warning("Yahoo quote API unavailable, falling back to HTML pages")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.scrape_yahoo_trending),
+                executor.submit(self.scrape_yahoo_gainers),
+                executor.submit(self.scrape_yahoo_most_active),
+            ]
+            stocks = [stock for future in futures for stock in future.result()]
+        
+        # Serve the fallback until the API is retried after the failure TTL
+        self._set_cache(cache_key, stocks, ttl=self._failure_ttl)
+        return stocks
+    
+    async def scrape_yahoo_batch_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_yahoo_batch"""
+        cache_key = 'yahoo_batch'
+        
+        if self._is_cached(cache_key):
+            return self._cache[cache_key][1]
+        
+        symbols = await self._scrape_async(session, 'yahoo_trending_api', (YAHOO_TRENDING_API_URL,),
+                                           self._parse_yahoo_trending_symbols, "Yahoo trending API")
+        if symbols:
+            stocks = await self._scrape_async(session, 'yahoo_quotes', (self._yahoo_quotes_url(symbols),),
+                                              self._parse_yahoo_quotes, "Yahoo quote API")
+            if stocks:
+                return stocks
+        
+        logger.warning("Yahoo quote API unavailable, falling back to HTML pages")
+        results = await asyncio.gather(
+            self.scrape_yahoo_trending_async(session),
+            self.scrape_yahoo_gainers_async(session),
+            self.scrape_yahoo_most_active_async(session),
+        )
+        stocks = [stock for result in results for stock in result]
+        
+        # Serve the fallback until the API is retried after the failure TTL
+        self._set_cache(cache_key, stocks, ttl=self._failure_ttl)
+        return stocks
+    
+    def _yahoo_quotes_url(self, symbols: List[str]) -> str:
+        """Quote API url for symbols, dropping cached quotes fetched for other symbols"""
+        url = f"{YAHOO_QUOTE_API_URL}?{urlencode({'symbols': ','.join(symbols)})}"
+        if url != self._yahoo_quote_url:
+            self._cache.pop('yahoo_quotes', None)
+            self._yahoo_quote_url = url
+        return url
+    
+    def _parse_yahoo_trending_symbols(self, content: bytes) -> List[str]:
+        """Parse the symbol list from Yahoo's trending API response"""
+        data = _json_loads(content)
+        return [quote['symbol'] for quote in data['finance']['result'][0]['quotes']]
+    
+    def _parse_yahoo_quotes(self, content: bytes) -> List[Dict]:
+        """
+        Build trending, gainers and most active entries from Yahoo quote API data
+        
+        Entries match the HTML scrapers' output. Gainers and most active are
+        ranked within the trending symbols by change % and volume.
+        """
+        quotes = []
+        for quote in _json_loads(content)['quoteResponse']['result']:
+            ticker = quote.get('symbol', '')
+            if ticker and len(ticker) <= 5:
+                quotes.append((
+                    ticker,
+                    quote.get('shortName') or quote.get('longName') or ticker,
+                    float(quote.get('regularMarketPrice') or 0),
+                    float(quote.get('regularMarketChange') or 0),
+                    float(quote.get('regularMarketChangePercent') or 0),
+                    int(quote.get('regularMarketVolume') or 0),
+                ))
+        
+        stocks = []
+        for ticker, name, price, change, change_pct, _ in quotes[:20]:
+            stocks.append({
+                'ticker': ticker,
+                'name': name,
+                'price': price,
+                'change': change,
+                'change_pct': change_pct,
+                'source': 'yahoo_trending',
+                'sentiment': 0.6 if change_pct > 0 else 0.4,
+                'score': abs(change_pct) / 10  # Higher change = higher score
+            })
+        
+        gainers = sorted((q for q in quotes if q[4] > 0), key=lambda q: q[4], reverse=True)
+        for ticker, name, price, _, change_pct, _ in gainers[:14]:
+            stocks.append({
+                'ticker': ticker,
+                'name': name,
+                'price': price,
+                'change_pct': change_pct,
+                'source': 'yahoo_gainers',
+                'sentiment': 0.75,  # Gainers are bullish
+                'action': 'BUY',
+                'score': change_pct / 10
+            })
+        
+        most_active = sorted(quotes, key=lambda q: q[5], reverse=True)
+        for ticker, name, price, _, change_pct, volume in most_active[:14]:
+            stocks.append({
+                'ticker': ticker,
+                'name': name,
+                'price': price,
+                'change_pct': change_pct,
+                'volume': volume,
+                'source': 'yahoo_most_active',
+                'sentiment': 0.6 if change_pct > 0 else 0.4,
+                'score': 0.7  # High activity = important
+            })
+        
+        return stocks
+    
+    def scrape_yahoo_trending(self) -> List[Dict]:
+        """Scrape Yahoo Finance trending tickers"""
+        return self._scrape('yahoo_trending', (YAHOO_TRENDING_URL,), self._parse_yahoo_trending, "Yahoo trending")
+    
+    async def scrape_yahoo_trending_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_yahoo_trending"""
+        return await self._scrape_async(session, 'yahoo_trending', (YAHOO_TRENDING_URL,), self._parse_yahoo_trending, "Yahoo trending")
+    
+    def _parse_yahoo_trending(self, content: bytes) -> List[Dict]:
+        """Parse the Yahoo Finance trending tickers page"""
+        stocks = []
+        
+        # Rows of the first (trending) table, skipping the header
+        for cols in _first_table_cells(content, 1, 21):
+            if len(cols) >= 5:
+                ticker = cols[0]
+                name = cols[1]
+                price = self._parse_number(cols[2])
+                change = self._parse_number(cols[3])
+                change_pct = self._parse_number(cols[4].replace('%', ''))
+                
+                if ticker and len(ticker) <= 5:
+                    stocks.append({
+                        'ticker': ticker,
+                        'name': name,
+                        'price': price,
+                        'change': change,
+                        'change_pct': change_pct,
+                        'source': 'yahoo_trending',
+                        'sentiment': 0.6 if change_pct > 0 else 0.4,
+                        'score': abs(change_pct) / 10  # Higher change = higher score
+                    })
         
         return stocks
     
     def scrape_yahoo_gainers(self) -> List[Dict]:
         """Scrape Yahoo Finance top gainers"""
+        return self._scrape('yahoo_gainers', (YAHOO_GAINERS_URL,), self._parse_yahoo_gainers, "Yahoo gainers")
+    
+    async def scrape_yahoo_gainers_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_yahoo_gainers"""
+        return await self._scrape_async(session, 'yahoo_gainers', (YAHOO_GAINERS_URL,), self._parse_yahoo_gainers, "Yahoo gainers")
+    
+    def _parse_yahoo_gainers(self, content: bytes) -> List[Dict]:
+        """Parse the Yahoo Finance top gainers page"""
         stocks = []
-        cache_key = 'yahoo_gainers'
         
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
-        
-        try:
-            url = "https://finance.yahoo.com/gainers"
-            response = self.session.get(url, timeout=self.timeout)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find stocks in the page
-            table = soup.find('table')
-            if table:
-                rows = table.find_all('tr')[1:15]
+        # Find stocks in the page
+        for cols in _first_table_cells(content, 1, 15):
+            if len(cols) >= 5:
+                ticker = cols[0]
+                name = cols[1]
+                price = self._parse_number(cols[2])
+                change_pct = self._parse_number(cols[4].replace('%', '').replace('+', ''))
                 
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) >= 5:
-                        ticker = cols[0].get_text(strip=True)
-                        name = cols[1].get_text(strip=True)
-                        price = self._parse_number(cols[2].get_text(strip=True))
-                        change_pct = self._parse_number(cols[4].get_text(strip=True).replace('%', '').replace('+', ''))
-                        
-                        if ticker and len(ticker) <= 5:
-                            stocks.append({
-                                'ticker': ticker,
-                                'name': name,
-                                'price': price,
-                                'change_pct': change_pct,
-                                'source': 'yahoo_gainers',
-                                'sentiment': 0.75,  # Gainers are bullish
-                                'action': 'BUY',
-                                'score': change_pct / 10
-                            })
-            
-            self._set_cache(cache_key, stocks)
-            
-        except Exception as e:
-            logger.error(f"Yahoo gainers error: {e}")
+                if ticker and len(ticker) <= 5:
+                    stocks.append({
+                        'ticker': ticker,
+                        'name': name,
+                        'price': price,
+                        'change_pct': change_pct,
+                        'source': 'yahoo_gainers',
+                        'sentiment': 0.75,  # Gainers are bullish
+                        'action': 'BUY',
+                        'score': change_pct / 10
+                    })
         
         return stocks
     
     def scrape_yahoo_most_active(self) -> List[Dict]:
         """Scrape Yahoo Finance most active stocks"""
+        return self._scrape('yahoo_active', (YAHOO_MOST_ACTIVE_URL,), self._parse_yahoo_most_active, "Yahoo most active")
+    
+    async def scrape_yahoo_most_active_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_yahoo_most_active"""
+        return await self._scrape_async(session, 'yahoo_active', (YAHOO_MOST_ACTIVE_URL,), self._parse_yahoo_most_active, "Yahoo most active")
+    
+    def _parse_yahoo_most_active(self, content: bytes) -> List[Dict]:
+        """Parse the Yahoo Finance most active page"""
         stocks = []
-        cache_key = 'yahoo_active'
-        
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
         
-        try:
-            url = "https://finance.yahoo.com/most-active"
-            response = self.session.get(url, timeout=self.timeout)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            table = soup.find('table')
-            if table:
-                rows = table.find_all('tr')[1:15]
+        for cols in _first_table_cells(content, 1, 15):
+            if len(cols) >= 6:
+                ticker = cols[0]
+                name = cols[1]
+                price = self._parse_number(cols[2])
+                change_pct = self._parse_number(cols[4].replace('%', '').replace('+', ''))
+                volume = cols[5]
                 
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) >= 6:
-                        ticker = cols[0].get_text(strip=True)
-                        name = cols[1].get_text(strip=True)
-                        price = self._parse_number(cols[2].get_text(strip=True))
-                        change_pct = self._parse_number(cols[4].get_text(strip=True).replace('%', '').replace('+', ''))
-                        volume = cols[5].get_text(strip=True)
-                        
-                        if ticker and len(ticker) <= 5:
-                            stocks.append({
-                                'ticker': ticker,
-                                'name': name,
-                                'price': price,
-                                'change_pct': change_pct,
-                                'volume': volume,
-                                'source': 'yahoo_most_active',
-                                'sentiment': 0.6 if change_pct > 0 else 0.4,
-                                'score': 0.7  # High activity = important
-                            })
-            
-            self._set_cache(cache_key, stocks)
-            
-        except Exception as e:
-            logger.error(f"Yahoo most active error: {e}")
+                if ticker and len(ticker) <= 5:
+                    stocks.append({
+                        'ticker': ticker,
+                        'name': name,
+                        'price': price,
+                        'change_pct': change_pct,
+                        'volume': volume,
+                        'source': 'yahoo_most_active',
+                        'sentiment': 0.6 if change_pct > 0 else 0.4,
+                        'score': 0.7  # High activity = important
+                    })
         
         return stocks
     
     def scrape_finviz_screener(self) -> List[Dict]:
         """Scrape Finviz for high volume momentum stocks"""
+        return self._scrape('finviz', (FINVIZ_SCREENER_URL,), self._parse_finviz_screener, "Finviz")
+    
+    async def scrape_finviz_screener_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_finviz_screener"""
+        return await self._scrape_async(session, 'finviz', (FINVIZ_SCREENER_URL,), self._parse_finviz_screener, "Finviz")
+    
+    def _parse_finviz_screener(self, content: bytes) -> List[Dict]:
+        """Parse the Finviz screener results page"""
         stocks = []
-        cache_key = 'finviz'
-        
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
-        
-        try:
-            # Finviz screener: unusual volume + price above SMA20
-            url = "https://finviz.com/screener.ashx?v=111&f=sh_avgvol_o500,sh_relvol_o1.5,ta_sma20_pa&ft=4"
-            response = self.session.get(url, timeout=self.timeout)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find stock table
-            table = soup.find('table', {'class': 'table-light'})
-            if table:
-                rows = table.find_all('tr')[1:15]
+        tree = lxml.html.fromstring(content)
+        
+        # Find stock table
+        rows = _FINVIZ_TABLE_ROWS(tree)[1:15]
+        
+        for row in rows:
+            cols = [_CELL_TEXT(td) for td in _ROW_CELLS(row)]
+            if len(cols) >= 10:
+                ticker = cols[1]
+                name = cols[2]
+                price = self._parse_number(cols[8])
+                change_pct = self._parse_number(cols[9].replace('%', ''))
                 
-                for row in rows:
-                    cols = row.find_all('td')
-                    if len(cols) >= 10:
-                        ticker = cols[1].get_text(strip=True)
-                        name = cols[2].get_text(strip=True)
-                        price = self._parse_number(cols[8].get_text(strip=True))
-                        change_pct = self._parse_number(cols[9].get_text(strip=True).replace('%', ''))
-                        
-                        if ticker:
-                            stocks.append({
-                                'ticker': ticker,
-                                'name': name,
-                                'price': price,
-                                'change_pct': change_pct,
-                                'source': 'finviz_momentum',
-                                'sentiment': 0.7,  # Momentum stocks
-                                'action': 'BUY',
-                                'score': 0.75
-                            })
-            
-            self._set_cache(cache_key, stocks)
-            
-        except Exception as e:
-            logger.error(f"Finviz error: {e}")
+                if ticker:
+                    stocks.append({
+                        'ticker': ticker,
+                        'name': name,
+                        'price': price,
+                        'change_pct': change_pct,
+                        'source': 'finviz_momentum',
+                        'sentiment': 0.7,  # Momentum stocks
+                        'action': 'BUY',
+                        'score': 0.75
+                    })
         
         return stocks
     
     def scrape_coingecko_trending(self) -> List[Dict]:
         """Scrape CoinGecko trending cryptocurrencies"""
+        return self._scrape('coingecko', COINGECKO_URLS, self._parse_coingecko, "CoinGecko")
+    
+    async def scrape_coingecko_trending_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_coingecko_trending"""
+        return await self._scrape_async(session, 'coingecko', COINGECKO_URLS, self._parse_coingecko, "CoinGecko")
+    
+    def _parse_coingecko(self, trending_content: bytes, movers_content: bytes) -> List[Dict]:
+        """Parse the CoinGecko trending and top-movers API responses"""
         stocks = []
-        cache_key = 'coingecko'
-        
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
-        
-        try:
-            # CoinGecko API for trending
-            url = "https://api.coingecko.com/api/v3/search/trending"
-            response = self.session.get(url, timeout=self.timeout)
-            data = response.json()
-            
-            if 'coins' in data:
-                for coin in data['coins'][:10]:
-                    item = coin.get('item', {})
-                    symbol = item.get('symbol', '').upper()
-                    name = item.get('name', '')
-                    market_cap_rank = item.get('market_cap_rank', 999)
-                    
-                    if symbol:
-                        stocks.append({
-                            'ticker': symbol,
-                            'name': name,
-                            'market_cap_rank': market_cap_rank,
-                            'source': 'coingecko_trending',
-                            'sentiment': 0.65,  # Trending = interest
-                            'score': 1 - (market_cap_rank / 1000) if market_cap_rank else 0.5,
-                            'market': 'CRYPTO'
-                        })
-            
-            # Also get top movers
-            url2 = "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=volume_desc&per_page=10"
-            response2 = self.session.get(url2, timeout=self.timeout)
-            data2 = response2.json()
-            
-            for coin in data2[:10]:
-                symbol = coin.get('symbol', '').upper()
-                change_24h = coin.get('price_change_percentage_24h', 0)
+        data = _json_loads(trending_content)
+        data2 = _json_loads(movers_content)
+        
+        if 'coins' in data:
+            for coin in data['coins'][:10]:
+                item = coin.get('item', {})
+                symbol = item.get('symbol', '').upper()
+                name = item.get('name', '')
+                market_cap_rank = item.get('market_cap_rank', 999)
                 
-                if symbol and abs(change_24h) > 3:  # Significant move
+                if symbol:
                     stocks.append({
                         'ticker': symbol,
-                        'name': coin.get('name', ''),
-                        'price': coin.get('current_price', 0),
-                        'change_pct': change_24h,
-                        'volume': coin.get('total_volume', 0),
-                        'source': 'coingecko_movers',
-                        'sentiment': 0.7 if change_24h > 0 else 0.3,
-                        'action': 'BUY' if change_24h > 5 else ('SELL' if change_24h < -5 else 'HOLD'),
-                        'score': abs(change_24h) / 20,
+                        'name': name,
+                        'market_cap_rank': market_cap_rank,
+                        'source': 'coingecko_trending',
+                        'sentiment': 0.65,  # Trending = interest
+                        'score': 1 - (market_cap_rank / 1000) if market_cap_rank else 0.5,
                         'market': 'CRYPTO'
                     })
-            
-            self._set_cache(cache_key, stocks)
-            
-        except Exception as e:
-            logger.error(f"CoinGecko error: {e}")
+        
+        # Also add top movers
+        for coin in data2[:10]:
+            symbol = coin.get('symbol', '').upper()
+            change_24h = coin.get('price_change_percentage_24h', 0)
+            
+            if symbol and abs(change_24h) > 3:  # Significant move
+                stocks.append({
+                    'ticker': symbol,
+                    'name': coin.get('name', ''),
+                    'price': coin.get('current_price', 0),
+                    'change_pct': change_24h,
+                    'volume': coin.get('total_volume', 0),
+                    'source': 'coingecko_movers',
+                    'sentiment': 0.7 if change_24h > 0 else 0.3,
+                    'action': 'BUY' if change_24h > 5 else ('SELL' if change_24h < -5 else 'HOLD'),
+                    'score': abs(change_24h) / 20,
+                    'market': 'CRYPTO'
+                })
         
         return stocks
     
     def scrape_tradingview_ideas(self) -> List[Dict]:
         """Scrape TradingView for popular trading ideas"""
+        return self._scrape('tradingview', (TRADINGVIEW_IDEAS_URL,), self._parse_tradingview_ideas, "TradingView")
+    
+    async def scrape_tradingview_ideas_async(self, session: "aiohttp.ClientSession") -> List[Dict]:
+        """Async variant of scrape_tradingview_ideas"""
+        return await self._scrape_async(session, 'tradingview', (TRADINGVIEW_IDEAS_URL,), self._parse_tradingview_ideas, "TradingView")
+    
+    def _parse_tradingview_ideas(self, content: bytes) -> List[Dict]:
+        """Parse the TradingView stock ideas page"""
         stocks = []
-        cache_key = 'tradingview'
+        soup = BeautifulSoup(content, 'lxml')
         
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
+        # Find idea cards
+        cards = soup.select(_SEL_IDEA_CARD, limit=15)
         
-        try:
-            # TradingView ideas page
-            url = "https://www.tradingview.com/ideas/stocks/"
-            response = self.session.get(url, timeout=self.timeout)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find idea cards
-            cards = soup.find_all('div', {'class': re.compile('idea-card')})[:15]
-            
-            for card in cards:
-                try:
-                    # Extract ticker from the card
-                    ticker_elem = card.find('a', {'class': re.compile('symbol')})
-                    if ticker_elem:
-                        ticker = ticker_elem.get_text(strip=True).upper()
-                        
-                        # Extract sentiment from idea type (long/short)
-                        idea_type = card.find('span', {'class': re.compile('type')})
-                        if idea_type:
-                            type_text = idea_type.get_text(strip=True).lower()
-                            if 'long' in type_text:
-                                sentiment = 0.75
-                                action = 'BUY'
-                            elif 'short' in type_text:
-                                sentiment = 0.25
-                                action = 'SELL'
-                            else:
-                                sentiment = 0.5
-                                action = 'HOLD'
+        for card in cards:
+            try:
+                # Extract ticker from the card
+                ticker_elem = card.select_one(_SEL_SYMBOL)
+                if ticker_elem:
+                    ticker = ticker_elem.get_text(strip=True).upper()
+                    
+                    # Extract sentiment from idea type (long/short)
+                    idea_type = card.select_one(_SEL_TYPE)
+                    if idea_type:
+                        type_text = idea_type.get_text(strip=True).lower()
+                        if 'long' in type_text:
+                            sentiment = 0.75
+                            action = 'BUY'
+                        elif 'short' in type_text:
+                            sentiment = 0.25
+                            action = 'SELL'
                         else:
                             sentiment = 0.5
                             action = 'HOLD'
-                        
-                        if ticker and len(ticker) <= 6:
-                            stocks.append({
-                                'ticker': ticker,
-                                'source': 'tradingview_ideas',
-                                'sentiment': sentiment,
-                                'action': action,
-                                'score': 0.6
-                            })
-                except:
-                    continue
-            
-            self._set_cache(cache_key, stocks)
-            
-        except Exception as e:
-            logger.error(f"TradingView error: {e}")
+                    else:
+                        sentiment = 0.5
+                        action = 'HOLD'
+                    
+                    if ticker and len(ticker) <= 6:
+                        stocks.append({
+                            'ticker': ticker,
+                            'source': 'tradingview_ideas',
+                            'sentiment': sentiment,
+                            'action': action,
+                            'score': 0.6
+                        })
+            except:
+                continue
         
         return stocks
     
@@ -378,39 +725,27 @@ class StockScraper:
         cache_key = 'reddit_wsb'
         
         if self._is_cached(cache_key):
-            return self._cache[cache_key]
+            return self._cache[cache_key][1]
         
         try:
             # Reddit JSON API
             url = "https://www.reddit.com/r/wallstreetbets/hot.json?limit=50"
             headers = {**HEADERS, 'Accept': 'application/json'}
             response = self.session.get(url, headers=headers, timeout=self.timeout)
-            data = response.json()
-            
-            # Common ticker pattern
-            ticker_pattern = re.compile(r'\$([A-Z]{2,5})\b|\b([A-Z]{2,5})\b')
-            ticker_counts = {}
-            
-            for post in data.get('data', {}).get('children', []):
-                post_data = post.get('data', {})
-                title = post_data.get('title', '')
-                selftext = post_data.get('selftext', '')[:500]
-                
-                # Find tickers
-                text = f"{title} {selftext}"
-                matches = ticker_pattern.findall(text)
-                
-                for match in matches:
-                    ticker = match[0] or match[1]
-                    if ticker and 2 <= len(ticker) <= 5:
-                        # Filter out common words
-                        if ticker not in {'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HAD', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'HAS', 'HIS', 'HOW', 'MAN', 'NEW', 'NOW', 'OLD', 'SEE', 'WAY', 'WHO', 'BOY', 'DID', 'GET', 'HAS', 'HIM', 'HIS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE', 'WSB', 'DD', 'IMO', 'YOLO', 'FD', 'OTM', 'ITM', 'ATM', 'EOD', 'EOW', 'IV', 'DTE'}:
-                            ticker_counts[ticker] = ticker_counts.get(ticker, 0) + 1
+            status = _failure_status((response.status_code,))
+            if status:
+                return self._cache_failure(cache_key, "Reddit WSB", f"HTTP {status}")
+            data = _json_loads(response.content)
+            
+            # Title plus the start of the body of every post, scanned in one pass
+            text = '\n'.join(
+                f"{post_data.get('title', '')} {post_data.get('selftext', '')[:500]}"
+                for post_data in (post.get('data', {}) for post in data.get('data', {}).get('children', []))
+            )
+            ticker_counts = Counter(_TICKER_RE.findall(text))
             
             # Top mentioned
-            sorted_tickers = sorted(ticker_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-            
-            for ticker, count in sorted_tickers:
+            for ticker, count in ticker_counts.most_common(10):
                 if count >= 2:  # At least 2 mentions
                     stocks.append({
                         'ticker': ticker,
@@ -424,7 +759,7 @@ class StockScraper:
             self._set_cache(cache_key, stocks)
             
         except Exception as e:
-            logger.error(f"Reddit WSB error: {e}")
+            return self._cache_failure(cache_key, "Reddit WSB", e)
         
         return stocks
     
@@ -434,7 +769,7 @@ class StockScraper:
         cache_key = 'nse_india'
         
         if self._is_cached(cache_key):
-            return self._cache[cache_key]
+            return self._cache[cache_key][1]
         
         try:
             # NSE India top gainers
@@ -446,11 +781,14 @@ class StockScraper:
             }
             
             # Need to get cookies first
-            self.session.get("https://www.nseindia.com/", timeout=self.timeout)
+            self._prime_nse_cookies()
             response = self.session.get(url, headers=headers, timeout=self.timeout)
+            status = _failure_status((response.status_code,))
+            if status:
+                return self._cache_failure(cache_key, "NSE India", f"HTTP {status}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
                 for stock in data.get('NIFTY', {}).get('data', [])[:10]:
                     symbol = stock.get('symbol', '')
@@ -472,106 +810,162 @@ class StockScraper:
             self._set_cache(cache_key, stocks)
             
         except Exception as e:
-            logger.error(f"NSE India error: {e}")
+            return self._cache_failure(cache_key, "NSE India", e)
         
         return stocks
     
-    def _aggregate_stocks(self, all_stocks: List[Dict]) -> List[Dict]:
-        """Aggregate stocks from multiple sources and rank them"""
+    def _prime_nse_cookies(self):
+        """Collect NSE session cookies without downloading the homepage body"""
+        response = self.session.head(NSE_HOME_URL, timeout=self.timeout, allow_redirects=True)
+        if response.status_code >= 400:
+            # HEAD rejected: stream the GET so only the headers are read
+            response = self.session.get(NSE_HOME_URL, timeout=self.timeout, stream=True)
+        response.close()
+    
+    def _aggregate_stocks(self, results: Dict[str, List[Dict]]) -> List[Dict]:
+        """
+        Aggregate stocks from multiple sources and rank them
         
-        # Group by ticker
-        aggregated = {}
+        Args:
+            results: Latest stock list per source name; missing sources failed
+        
+        Returns:
+            Ranked stocks, best score first
+        """
+        with self._index_lock:
+            for source, _ in _TRENDING_SOURCES:
+                self._update_source(source, results.get(source, ()))
+            
+            if self._dirty:
+                for ticker in self._dirty:
+                    partials = [
+                        self._source_partials[source][ticker]
+                        for source, _ in _TRENDING_SOURCES
+                        if ticker in self._source_partials.get(source, {})
+                    ]
+                    if partials:
+                        self._ranked_rows[ticker] = self._score_ticker(ticker, partials)
+                    else:
+                        self._ranked_rows.pop(ticker, None)
+                self._dirty.clear()
+                
+                # Sort by score
+                self._ranked = sorted(self._ranked_rows.values(), key=lambda x: x['score'], reverse=True)
+            
+            ranked = self._ranked
         
-        for stock in all_stocks:
+        # Callers annotate the rows in place, so hand out copies stamped
+        # with one shared timestamp for this call
+        now_iso = datetime.now().isoformat()
+        return [dict(row, timestamp=now_iso) for row in ranked]
+    
+    def _update_source(self, source: str, stocks: List[Dict]):
+        """Record a source's latest result and mark the tickers it touches dirty"""
+        if self._source_results.get(source) is stocks:
+            return
+        
+        # Group by ticker, keeping running sums and counts in a single pass
+        partials = {}
+        for stock in stocks:
             ticker = stock.get('ticker', '').upper()
             if not ticker:
                 continue
             
-            if ticker not in aggregated:
-                aggregated[ticker] = {
-                    'ticker': ticker,
+            data = partials.get(ticker)
+            if data is None:
+                data = partials[ticker] = {
                     'name': stock.get('name', ticker),
-                    'sources': [],
-                    'sentiments': [],
-                    'scores': [],
-                    'actions': [],
+                    'sources': set(),
+                    'mentions': 0,
+                    'sentiment_sum': 0.0,
+                    'score_sum': 0.0,
+                    'actions': 0,
+                    'buy': 0,
+                    'sell': 0,
                     'price': stock.get('price'),
                     'change_pct': stock.get('change_pct'),
                     'market': stock.get('market', 'US')
                 }
             
-            aggregated[ticker]['sources'].append(stock.get('source', 'unknown'))
-            aggregated[ticker]['sentiments'].append(stock.get('sentiment', 0.5))
-            aggregated[ticker]['scores'].append(stock.get('score', 0.5))
-            if stock.get('action'):
-                aggregated[ticker]['actions'].append(stock['action'])
-        
-        # Calculate final scores
-        ranked = []
-        for ticker, data in aggregated.items():
-            # More sources = more confidence
-            source_bonus = len(set(data['sources'])) * 0.1
-            
-            avg_sentiment = sum(data['sentiments']) / len(data['sentiments'])
-            avg_score = sum(data['scores']) / len(data['scores'])
-            
-            # Determine action
-            if data['actions']:
-                buy_count = data['actions'].count('BUY')
-                sell_count = data['actions'].count('SELL')
-                if buy_count > sell_count:
-                    action = 'BUY'
-                elif sell_count > buy_count:
-                    action = 'SELL'
-                else:
-                    action = 'HOLD'
+            data['sources'].add(stock.get('source', 'unknown'))
+            data['mentions'] += 1
+            data['sentiment_sum'] += stock.get('sentiment', 0.5)
+            data['score_sum'] += stock.get('score', 0.5)
+            action = stock.get('action')
+            if action:
+                data['actions'] += 1
+                data['buy'] += action == 'BUY'
+                data['sell'] += action == 'SELL'
+        
+        # Only tickers whose partial sums changed (including ones that
+        # appeared or dropped out) need re-scoring
+        old_partials = self._source_partials.get(source, {})
+        self._dirty.update(
+            ticker for ticker in old_partials.keys() | partials.keys()
+            if old_partials.get(ticker) != partials.get(ticker)
+        )
+        self._source_results[source] = stocks
+        self._source_partials[source] = partials
+    
+    def _score_ticker(self, ticker: str, partials: List[Dict]) -> Dict:
+        """Combine a ticker's per-source partial sums into its ranked row"""
+        first = partials[0]
+        sources = set().union(*(data['sources'] for data in partials))
+        source_count = len(sources)
+        
+        # More sources = more confidence
+        source_bonus = source_count * 0.1
+        
+        mentions = sum(data['mentions'] for data in partials)
+        avg_sentiment = sum(data['sentiment_sum'] for data in partials) / mentions
+        avg_score = sum(data['score_sum'] for data in partials) / mentions
+        
+        # Determine action
+        if any(data['actions'] for data in partials):
+            buy_count = sum(data['buy'] for data in partials)
+            sell_count = sum(data['sell'] for data in partials)
+            if buy_count > sell_count:
+                action = 'BUY'
+            elif sell_count > buy_count:
+                action = 'SELL'
             else:
-                action = 'BUY' if avg_sentiment > 0.55 else ('SELL' if avg_sentiment < 0.45 else 'HOLD')
-            
-            final_score = avg_score + source_bonus
-            confidence = min(0.95, avg_sentiment * 0.6 + (len(data['sources']) / 10) * 0.4)
-            
-            ranked.append({
-                'ticker': ticker,
-                'name': data['name'],
-                'price': data['price'],
-                'change_pct': data['change_pct'],
-                'sentiment': avg_sentiment,
-                'score': final_score,
-                'confidence': confidence,
-                'action': action,
-                'sources': list(set(data['sources'])),
-                'source_count': len(set(data['sources'])),
-                'market': data['market'],
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        # Sort by score
-        ranked.sort(key=lambda x: x['score'], reverse=True)
-        
-        return ranked
+                action = 'HOLD'
+        else:
+            action = 'BUY' if avg_sentiment > 0.55 else ('SELL' if avg_sentiment < 0.45 else 'HOLD')
+        
+        final_score = avg_score + source_bonus
+        confidence = min(0.95, avg_sentiment * 0.6 + (mentions / 10) * 0.4)
+        
+        return {
+            'ticker': ticker,
+            'name': first['name'],
+            'price': first['price'],
+            'change_pct': first['change_pct'],
+            'sentiment': avg_sentiment,
+            'score': final_score,
+            'confidence': confidence,
+            'action': action,
+            'sources': list(sources),
+            'source_count': source_count,
+            'market': first['market']
+        }
     
     def _parse_number(self, text: str) -> float:
         """Parse number from text"""
         try:
             # Remove currency symbols and commas
-            cleaned = re.sub(r'[,$€£₹%+]', '', text)
-            return float(cleaned)
+            return float(text.translate(_NUM_TRANSLATE))
         except:
             return 0.0
     
     def _is_cached(self, key: str) -> bool:
         """Check if data is cached and fresh"""
-        if key not in self._cache:
-            return False
-        if key not in self._cache_time:
-            return False
-        return datetime.now() - self._cache_time[key] < self._cache_duration
-    
-    def _set_cache(self, key: str, data: List):
-        """Set cache data"""
-        self._cache[key] = data
-        self._cache_time[key] = datetime.now()
+        entry = self._cache.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+    
+    def _set_cache(self, key: str, data: List, ttl: Optional[float] = None, validators: Tuple = ()):
+        """Set cache data, expiring after ttl seconds (default: self._cache_ttl)"""
+        self._cache[key] = (time.monotonic() + (self._cache_ttl if ttl is None else ttl), data, validators)
 
 
 def create_stock_scraper(config: Dict = None) -> StockScraper:
@@ -11,13 +11,243 @@ Stores:
 import sqlite3
 import json
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import queue
+import threading
+import warnings
+import weakref
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning: WAL makes synchronous=NORMAL safe (one fsync per
+# checkpoint instead of two per commit), with temp tables, a 20MB page cache
+# and 256MB of memory-mapped I/O kept in RAM. busy_timeout is covered by
+# sqlite3.connect's default 5 second timeout.
+#
+# File databases are deliberately not opened with cache=shared: shared-cache
+# mode swaps WAL's snapshot reads for table-level locks, so readers would
+# block on the writer thread. Each connection is long-lived, so its private
+# cache stays warm, and mmap serves hot pages to every connection from one
+# shared mapping of the file.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Most queued writes the writer thread commits in one transaction
+_WRITE_BATCH_SIZE = 64
+
+# Seconds a queued write waits between checks that the writer thread is alive
+_WRITER_POLL_INTERVAL = 1.0
+
+# Size of each connection's prepared statement cache; every statement below
+# is a fixed string so repeated calls skip parsing and planning
+_CACHED_STATEMENTS = 256
+
+# Explicit column lists for the row-returning reads; rows come back as plain
+# tuples and are zipped with these into dicts
+_POSITION_COLS = (
+    "id", "symbol", "action", "quantity", "entry_price", "entry_time", "market", "broker",
+    "bracket_id", "stop_loss_price", "take_profit_price", "trailing_stop_pct", "status",
+    "exit_price", "exit_time", "pnl", "pnl_pct", "metadata", "created_at", "updated_at",
+)
+_TRADE_COLS = (
+    "id", "symbol", "action", "quantity", "price", "order_type", "market", "broker",
+    "order_id", "status", "fill_price", "fill_time", "commission", "paper_trading",
+    "decision_text", "confidence", "bracket_id", "error", "metadata", "created_at",
+)
+_BRACKET_COLS = (
+    "id", "symbol", "action", "quantity", "entry_price", "stop_loss_pct", "stop_loss_price",
+    "take_profit_pct", "take_profit_price", "trailing_stop_pct", "trailing_activation_pct",
+    "highest_price", "lowest_price", "status", "trigger_reason", "triggered_at", "created_at",
+)
+# Columns holding JSON text, decoded into Python objects by _fetch_dicts
+_JSON_COLS = frozenset({"metadata"})
+
+# Local wall-clock time in the isoformat() shape (millisecond precision),
+# computed by SQLite inside the statement instead of passed in from Python
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+_POSITION_SELECT = f"SELECT {', '.join(_POSITION_COLS)} FROM positions"
+_TRADE_SELECT = f"SELECT {', '.join(_TRADE_COLS)} FROM trades"
+_BRACKET_SELECT = f"SELECT {', '.join(_BRACKET_COLS)} FROM bracket_orders"
+
+# Positions schema, formatted with the table name so migrations can rebuild it.
+# At most one open position per symbol is enforced by idx_positions_open.
+_SQL_CREATE_POSITIONS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        action TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        entry_price REAL NOT NULL,
+        entry_time TEXT NOT NULL,
+        market TEXT,
+        broker TEXT,
+        bracket_id TEXT,
+        stop_loss_price REAL,
+        take_profit_price REAL,
+        trailing_stop_pct REAL,
+        status TEXT DEFAULT 'open',
+        exit_price REAL,
+        exit_time TEXT,
+        pnl REAL,
+        pnl_pct REAL,
+        metadata TEXT CHECK (metadata IS NULL OR json_valid(metadata)),
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+# Updates an existing open position in place, keeping its id; needs SQLite
+# 3.35+ for RETURNING
+_SQL_INSERT_POSITION = f"""
+    INSERT INTO positions 
+    (symbol, action, quantity, entry_price, entry_time, market, broker,
+     bracket_id, stop_loss_price, take_profit_price, trailing_stop_pct,
+     status, metadata, updated_at)
+    VALUES (?, ?, ?, ?, {_SQL_NOW}, ?, ?, ?, ?, ?, ?, 'open', ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(symbol) WHERE status = 'open' DO UPDATE SET
+        action = excluded.action,
+        quantity = excluded.quantity,
+        entry_price = excluded.entry_price,
+        entry_time = excluded.entry_time,
+        market = excluded.market,
+        broker = excluded.broker,
+        bracket_id = excluded.bracket_id,
+        stop_loss_price = excluded.stop_loss_price,
+        take_profit_price = excluded.take_profit_price,
+        trailing_stop_pct = excluded.trailing_stop_pct,
+        metadata = excluded.metadata,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING id
+"""
+_SQL_CLOSE_POSITION = f"""
+    UPDATE positions 
+    SET status = 'closed', exit_price = ?, exit_time = {_SQL_NOW},
+        pnl = ?, pnl_pct = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE symbol = ? AND status = 'open'
+"""
+_SQL_SELECT_OPEN_POSITIONS = f"{_POSITION_SELECT} WHERE status = 'open'"
+_SQL_SELECT_POSITION = f"{_POSITION_SELECT} WHERE symbol = ? AND status = 'open'"
+_SQL_SELECT_CLOSED_POSITIONS = f"{_POSITION_SELECT} WHERE status = 'closed' ORDER BY exit_time DESC LIMIT ?"
+_SQL_SELECT_OPEN_POSITION_TOTALS = (
+    "SELECT COUNT(*), COALESCE(SUM(quantity * entry_price), 0) FROM positions WHERE status = 'open'"
+)
+
+_SQL_INSERT_TRADE = """
+    INSERT INTO trades 
+    (symbol, action, quantity, price, order_type, market, broker,
+     order_id, status, paper_trading, decision_text, confidence,
+     bracket_id, metadata, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+_SQL_SELECT_TRADES = f"{_TRADE_SELECT} ORDER BY created_at DESC LIMIT ?"
+_SQL_SELECT_SYMBOL_TRADES = f"{_TRADE_SELECT} WHERE symbol = ? ORDER BY created_at DESC LIMIT ?"
+# A bare range on created_at (not DATE(created_at) = ?) can use idx_trades_created
+_SQL_SELECT_TODAY_TRADES = f"{_TRADE_SELECT} WHERE created_at >= ? AND created_at < ? ORDER BY created_at DESC"
+
+_SQL_INSERT_BRACKET_ORDER = """
+    INSERT OR REPLACE INTO bracket_orders 
+    (id, symbol, action, quantity, entry_price, stop_loss_pct, stop_loss_price,
+     take_profit_pct, take_profit_price, trailing_stop_pct, trailing_activation_pct,
+     highest_price, lowest_price, status, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', CURRENT_TIMESTAMP)
+"""
+_SQL_SELECT_ACTIVE_BRACKET_ORDERS = f"{_BRACKET_SELECT} WHERE status = 'active'"
+
+_DAILY_STATS_COLS = (
+    "date", "trades_count", "winning_trades", "losing_trades", "total_pnl",
+    "largest_win", "largest_loss", "volume_traded",
+)
+# Daily figures derived from closed positions on read, so the win/loss
+# classification lives in one place instead of with every caller.
+# volume_traded is the entry notional (quantity * entry_price) of the
+# positions closed that day, the same valuation as get_portfolio_summary.
+_SQL_CREATE_DAILY_STATS_VIEW = """
+    CREATE VIEW IF NOT EXISTS v_daily_stats AS
+    SELECT DATE(exit_time) AS date,
+           COUNT(*) AS trades_count,
+           SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) AS winning_trades,
+           SUM(CASE WHEN pnl < 0 THEN 1 ELSE 0 END) AS losing_trades,
+           COALESCE(SUM(pnl), 0) AS total_pnl,
+           MAX(COALESCE(MAX(pnl), 0), 0) AS largest_win,
+           MIN(COALESCE(MIN(pnl), 0), 0) AS largest_loss,
+           COALESCE(SUM(quantity * entry_price), 0) AS volume_traded
+    FROM positions
+    WHERE status = 'closed'
+    GROUP BY DATE(exit_time)
+"""
+_SQL_SELECT_DAILY_STATS = f"SELECT {', '.join(_DAILY_STATS_COLS)} FROM v_daily_stats WHERE date = ?"
+# update_daily_stats warns about its deprecation only on its first call
+_update_daily_stats_warned = False
+
+# Needs SQLite 3.24+ for ON CONFLICT ... DO UPDATE
+_SQL_UPSERT_DAILY_STATS = """
+    INSERT INTO daily_stats 
+    (date, trades_count, winning_trades, losing_trades, total_pnl,
+     volume_traded, largest_win, largest_loss)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date) DO UPDATE SET
+        trades_count = trades_count + excluded.trades_count,
+        winning_trades = winning_trades + excluded.winning_trades,
+        losing_trades = losing_trades + excluded.losing_trades,
+        total_pnl = total_pnl + excluded.total_pnl,
+        volume_traded = volume_traded + excluded.volume_traded,
+        largest_win = MAX(largest_win, excluded.largest_win),
+        largest_loss = MIN(largest_loss, excluded.largest_loss)
+"""
+
+_SQL_UPSERT_SETTING = """
+    INSERT OR REPLACE INTO settings (key, value, updated_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+"""
+_SQL_SELECT_SETTING = "SELECT value FROM settings WHERE key = ?"
+
+
+def _to_json(value: Any) -> Optional[str]:
+    """Serialise a metadata value for binding; empty or missing metadata is stored as NULL"""
+    return json.dumps(value) if value else None
+
+
+def _update_sql(table: str, assignments: Tuple[str, ...]) -> Dict[int, str]:
+    """
+    Precompute "UPDATE table SET ... WHERE id = ?" for every non-empty subset of assignments
+
+    Args:
+        table: Table to update
+        assignments: SET clauses; bit i of a mask selects assignments[i]
+
+    Returns:
+        SQL keyed by bitmask, 1 through 2**len(assignments) - 1
+    """
+    return {
+        mask: f"UPDATE {table} SET {', '.join(a for i, a in enumerate(assignments) if mask >> i & 1)} WHERE id = ?"
+        for mask in range(1, 1 << len(assignments))
+    }
+
+
+# Keyed by a bitmask of which of update_trade's (status, fill_price, error) are set
+_SQL_UPDATE_TRADE = _update_sql("trades", (
+    "status = ?",
+    f"fill_price = ?, fill_time = {_SQL_NOW}",
+    "error = ?",
+))
+# Keyed by a bitmask of which of update_bracket_order's (status,
+# stop_loss_price, highest_price, lowest_price, trigger_reason) are set
+_SQL_UPDATE_BRACKET_ORDER = _update_sql("bracket_orders", (
+    "status = ?",
+    "stop_loss_price = ?",
+    "highest_price = ?",
+    "lowest_price = ?",
+    f"trigger_reason = ?, triggered_at = {_SQL_NOW}",
+))
+
 
 class TradingDatabase:
     """SQLite database for trading state persistence"""
@@ -32,134 +262,358 @@ class TradingDatabase:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        self._init_database()
+        # ":memory:" becomes a named shared-cache database so the writer
+        # thread and the reader connections all see the same data
+        self._in_memory = str(db_path) == ":memory:"
+        if self._in_memory:
+            self._database = f"file:trading_db_{id(self)}?mode=memory&cache=shared"
+        else:
+            self._database = str(self.db_path)
+        
+        # Reads use one long-lived read-only connection per thread; all
+        # writes are queued to a single writer thread that owns the only
+        # read-write connection, so writers never contend for the lock
+        self._conn_local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._conn_lock = threading.Lock()
+        self._write_queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        # Set by a writer that stopped on an error, before it exits
+        self._writer_stopped = threading.Event()
+        # The writer thread holds no reference to self, so an instance that
+        # is dropped without close() still stops its writer
+        weakref.finalize(self, self._write_queue.put, None)
+        
+        self._write(self._init_database)
         logger.info(f"Trading database initialized at {self.db_path}")
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a tuned autocommit connection to the database"""
+        conn = sqlite3.connect(
+            self._database, uri=True, check_same_thread=False,
+            isolation_level=None, cached_statements=_CACHED_STATEMENTS
+        )
+        try:
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        except Exception:
+            conn.close()
+            raise
+        # No row_factory: rows stay plain tuples, read by index or zipped
+        # into dicts by _fetch_dicts
+        return conn
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's read-only connection, opening it on first use"""
+        conn = getattr(self._conn_local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            conn.execute("PRAGMA query_only=ON")
+            if self._in_memory:
+                # A shared-cache database locks per table and the busy handler
+                # does not retry those locks; readers skipping their read
+                # locks keep them from failing the writer
+                conn.execute("PRAGMA read_uncommitted=1")
+            self._conn_local.conn = conn
+            
+            with self._conn_lock:
+                # Close connections left behind by threads that have exited
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+    
     @contextmanager
     def _get_connection(self):
-        """Get database connection with context manager"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        """Get this thread's read-only connection inside a read transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN DEFERRED")
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
         finally:
+            conn.execute("COMMIT")
+    
+    @staticmethod
+    def _fetch_dicts(conn: sqlite3.Connection, cols: Tuple[str, ...], sql: str, params: tuple = ()) -> List[Dict]:
+        """Run a SELECT of cols and zip each tuple row into a dict, decoding JSON columns"""
+        rows = [dict(zip(cols, row)) for row in conn.execute(sql, params).fetchall()]
+        json_cols = _JSON_COLS.intersection(cols)
+        if json_cols:
+            for row in rows:
+                for col in json_cols:
+                    if row[col] is not None:
+                        row[col] = json.loads(row[col])
+        return rows
+    
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run fn on the writer thread's connection and wait for it to commit
+        
+        Args:
+            fn: Callable taking the write connection; its return value is passed back
+        
+        Returns:
+            fn's result, once the transaction containing it has committed
+        """
+        future = Future()
+        with self._conn_lock:
+            writer = self._writer
+            if writer is None or not writer.is_alive() or self._writer_stopped.is_set():
+                # Opened here so a database that cannot be opened fails the caller
+                conn = self._open_writer_connection()
+                self._writer_stopped = threading.Event()
+                writer = threading.Thread(
+                    target=self._writer_loop,
+                    args=(self._write_queue, conn, self._conn_lock, self._writer_stopped),
+                    name="TradingDatabaseWriter",
+                    daemon=True,
+                )
+                writer.start()
+                self._writer = writer
+            self._write_queue.put((fn, future))
+        
+        while True:
+            try:
+                return future.result(timeout=_WRITER_POLL_INTERVAL)
+            except FutureTimeoutError:
+                if not writer.is_alive() and not future.done():
+                    raise sqlite3.OperationalError("Trading database writer thread stopped")
+    
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run one write statement on the writer thread"""
+        return self._write(lambda conn: conn.execute(sql, params))
+    
+    def _open_writer_connection(self) -> sqlite3.Connection:
+        """Open the read-write connection owned by the writer thread"""
+        conn = self._open_connection()
+        # WAL lets readers run alongside the writer; unlike the other PRAGMAs
+        # it is stored in the database file
+        if not self._in_memory:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except Exception:
+                conn.close()
+                raise
+        return conn
+    
+    @staticmethod
+    def _commit_batch(conn: sqlite3.Connection, batch: List[tuple]):
+        """Run a batch of queued writes in one transaction and resolve their futures"""
+        # Each item runs in its own savepoint so a failing write is rolled
+        # back alone; futures resolve only after the commit
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                conn.execute("SAVEPOINT write_item")
+                try:
+                    results.append((future, fn(conn), None))
+                    conn.execute("RELEASE write_item")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_item")
+                    conn.execute("RELEASE write_item")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            # If the rollback itself fails the writer exits and the next
+            # write starts a writer on a fresh connection
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            finally:
+                for _, future in batch:
+                    future.set_exception(e)
+            return
+        
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+    
+    @staticmethod
+    def _writer_loop(
+        write_queue: queue.Queue,
+        conn: sqlite3.Connection,
+        lock: threading.Lock,
+        stopped: threading.Event,
+    ):
+        """Drain the write queue, committing runs of queued writes together"""
+        batch = []
+        running = True
+        try:
+            while running:
+                batch = [write_queue.get()]
+                while len(batch) < _WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    running = False
+                    batch = [item for item in batch if item is not None]
+                if not batch:
+                    continue
+                
+                TradingDatabase._commit_batch(conn, batch)
+                batch = []
+        finally:
+            if running:
+                # Stopped by an error: fail everything still waiting on this writer
+                logger.error("Trading database writer thread stopped unexpectedly")
+                error = sqlite3.OperationalError("Trading database writer thread stopped")
+                # Under the lock _write cannot queue more work for this thread,
+                # and the next write starts a fresh writer
+                with lock:
+                    stopped.set()
+                    while True:
+                        try:
+                            item = write_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is not None:
+                            batch.append(item)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
             conn.close()
     
-    def _init_database(self):
+    def close(self):
+        """Stop the writer thread and close every cached connection; later calls reconnect"""
+        with self._conn_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None and writer.is_alive():
+                self._write_queue.put(None)
+        if writer is not None:
+            writer.join()
+        
+        with self._conn_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            # A fresh local drops the closed connections from every thread
+            self._conn_local = threading.local()
+    
+    def __enter__(self) -> "TradingDatabase":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _init_database(self, conn: sqlite3.Connection):
         """Initialize database schema"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Positions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS positions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    entry_price REAL NOT NULL,
-                    entry_time TEXT NOT NULL,
-                    market TEXT,
-                    broker TEXT,
-                    bracket_id TEXT,
-                    stop_loss_price REAL,
-                    take_profit_price REAL,
-                    trailing_stop_pct REAL,
-                    status TEXT DEFAULT 'open',
-                    exit_price REAL,
-                    exit_time TEXT,
-                    pnl REAL,
-                    pnl_pct REAL,
-                    metadata TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(symbol, status) ON CONFLICT REPLACE
-                )
-            """)
-            
-            # Trades table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    price REAL,
-                    order_type TEXT DEFAULT 'MARKET',
-                    market TEXT,
-                    broker TEXT,
-                    order_id TEXT,
-                    status TEXT DEFAULT 'pending',
-                    fill_price REAL,
-                    fill_time TEXT,
-                    commission REAL DEFAULT 0,
-                    paper_trading INTEGER DEFAULT 1,
-                    decision_text TEXT,
-                    confidence REAL,
-                    bracket_id TEXT,
-                    error TEXT,
-                    metadata TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Bracket orders table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bracket_orders (
-                    id TEXT PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    entry_price REAL NOT NULL,
-                    stop_loss_pct REAL,
-                    stop_loss_price REAL,
-                    take_profit_pct REAL,
-                    take_profit_price REAL,
-                    trailing_stop_pct REAL,
-                    trailing_activation_pct REAL,
-                    highest_price REAL,
-                    lowest_price REAL,
-                    status TEXT DEFAULT 'active',
-                    trigger_reason TEXT,
-                    triggered_at TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Daily statistics table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_stats (
-                    date TEXT PRIMARY KEY,
-                    trades_count INTEGER DEFAULT 0,
-                    winning_trades INTEGER DEFAULT 0,
-                    losing_trades INTEGER DEFAULT 0,
-                    total_pnl REAL DEFAULT 0,
-                    largest_win REAL DEFAULT 0,
-                    largest_loss REAL DEFAULT 0,
-                    volume_traded REAL DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Settings table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_symbol ON positions(symbol)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_status ON positions(status)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_created ON trades(created_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_bracket_status ON bracket_orders(status)")
+        cursor = conn.cursor()
+        
+        # Positions table
+        cursor.execute(_SQL_CREATE_POSITIONS.format(table="positions"))
+        self._migrate_positions_table(conn)
+        
+        # Trades table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                action TEXT NOT NULL,
+                quantity REAL NOT NULL,
+                price REAL,
+                order_type TEXT DEFAULT 'MARKET',
+                market TEXT,
+                broker TEXT,
+                order_id TEXT,
+                status TEXT DEFAULT 'pending',
+                fill_price REAL,
+                fill_time TEXT,
+                commission REAL DEFAULT 0,
+                paper_trading INTEGER DEFAULT 1,
+                decision_text TEXT,
+                confidence REAL,
+                bracket_id TEXT,
+                error TEXT,
+                metadata TEXT CHECK (metadata IS NULL OR json_valid(metadata)),
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Bracket orders table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bracket_orders (
+                id TEXT PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                action TEXT NOT NULL,
+                quantity REAL NOT NULL,
+                entry_price REAL NOT NULL,
+                stop_loss_pct REAL,
+                stop_loss_price REAL,
+                take_profit_pct REAL,
+                take_profit_price REAL,
+                trailing_stop_pct REAL,
+                trailing_activation_pct REAL,
+                highest_price REAL,
+                lowest_price REAL,
+                status TEXT DEFAULT 'active',
+                trigger_reason TEXT,
+                triggered_at TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Daily statistics table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                date TEXT PRIMARY KEY,
+                trades_count INTEGER DEFAULT 0,
+                winning_trades INTEGER DEFAULT 0,
+                losing_trades INTEGER DEFAULT 0,
+                total_pnl REAL DEFAULT 0,
+                largest_win REAL DEFAULT 0,
+                largest_loss REAL DEFAULT 0,
+                volume_traded REAL DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Settings table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL CHECK (json_valid(value)),
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Create indexes
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_symbol ON positions(symbol)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_status ON positions(status)")
+        # Partial unique index over open positions: the hot lookup, and the
+        # one-open-position-per-symbol rule save_position upserts against
+        cursor.execute("DROP INDEX IF EXISTS idx_positions_status_symbol")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_positions_open ON positions(symbol) WHERE status = 'open'"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_created ON trades(created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bracket_status ON bracket_orders(status)")
+        # Expression index matching the view's grouping key, so a one-day lookup
+        # only visits that day's closed positions
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_positions_closed_day ON positions(DATE(exit_time)) WHERE status = 'closed'"
+        )
+        cursor.execute(_SQL_CREATE_DAILY_STATS_VIEW)
+    
+    def _migrate_positions_table(self, conn: sqlite3.Connection):
+        """Rebuild a positions table still carrying UNIQUE(symbol, status) ON CONFLICT REPLACE"""
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'positions'").fetchone()
+        if "ON CONFLICT REPLACE" not in row[0]:
+            return
+        
+        logger.info("Migrating positions table to the open-position unique index")
+        cols = ", ".join(_POSITION_COLS)
+        # The view is recreated with the other schema objects afterwards
+        conn.execute("DROP VIEW IF EXISTS v_daily_stats")
+        conn.execute(_SQL_CREATE_POSITIONS.format(table="positions_new"))
+        conn.execute(f"INSERT INTO positions_new ({cols}) SELECT {cols} FROM positions")
+        conn.execute("DROP TABLE positions")
+        conn.execute("ALTER TABLE positions_new RENAME TO positions")
     
     # ==================== POSITIONS ====================
     
@@ -178,20 +632,11 @@ class TradingDatabase:
         metadata: Dict = None
     ) -> int:
         """Save or update a position"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO positions 
-                (symbol, action, quantity, entry_price, entry_time, market, broker,
-                 bracket_id, stop_loss_price, take_profit_price, trailing_stop_pct,
-                 status, metadata, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'open', ?, CURRENT_TIMESTAMP)
-            """, (
-                symbol, action, quantity, entry_price, datetime.now().isoformat(),
-                market, broker, bracket_id, stop_loss_price, take_profit_price,
-                trailing_stop_pct, json.dumps(metadata) if metadata else None
-            ))
-            return cursor.lastrowid
+        params = (
+            symbol, action, quantity, entry_price, market, broker,
+            bracket_id, stop_loss_price, take_profit_price, trailing_stop_pct, _to_json(metadata)
+        )
+        return self._write(lambda conn: conn.execute(_SQL_INSERT_POSITION, params).fetchone()[0])
     
     def close_position(
         self,
@@ -201,42 +646,24 @@ class TradingDatabase:
         pnl_pct: float = None
     ) -> bool:
         """Close a position"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE positions 
-                SET status = 'closed', exit_price = ?, exit_time = ?,
-                    pnl = ?, pnl_pct = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE symbol = ? AND status = 'open'
-            """, (exit_price, datetime.now().isoformat(), pnl, pnl_pct, symbol))
-            return cursor.rowcount > 0
+        cursor = self._execute(_SQL_CLOSE_POSITION, (exit_price, pnl, pnl_pct, symbol))
+        return cursor.rowcount > 0
     
     def get_open_positions(self) -> List[Dict]:
         """Get all open positions"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM positions WHERE status = 'open'")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return self._fetch_dicts(conn, _POSITION_COLS, _SQL_SELECT_OPEN_POSITIONS)
     
     def get_position(self, symbol: str) -> Optional[Dict]:
         """Get position for a symbol"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM positions WHERE symbol = ? AND status = 'open'", (symbol,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            rows = self._fetch_dicts(conn, _POSITION_COLS, _SQL_SELECT_POSITION, (symbol,))
+            return rows[0] if rows else None
     
     def get_closed_positions(self, limit: int = 100) -> List[Dict]:
         """Get closed positions"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM positions WHERE status = 'closed' ORDER BY exit_time DESC LIMIT ?",
-                (limit,)
-            )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return self._fetch_dicts(conn, _POSITION_COLS, _SQL_SELECT_CLOSED_POSITIONS, (limit,))
     
     # ==================== TRADES ====================
     
@@ -258,20 +685,54 @@ class TradingDatabase:
         metadata: Dict = None
     ) -> int:
         """Save a trade record"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO trades 
-                (symbol, action, quantity, price, order_type, market, broker,
-                 order_id, status, paper_trading, decision_text, confidence,
-                 bracket_id, metadata, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                symbol, action, quantity, price, order_type, market, broker,
-                order_id, status, 1 if paper_trading else 0, decision_text,
-                confidence, bracket_id, json.dumps(metadata) if metadata else None
-            ))
-            return cursor.lastrowid
+        return self.save_trades_batch([{
+            "symbol": symbol,
+            "action": action,
+            "quantity": quantity,
+            "price": price,
+            "order_type": order_type,
+            "market": market,
+            "broker": broker,
+            "order_id": order_id,
+            "status": status,
+            "paper_trading": paper_trading,
+            "decision_text": decision_text,
+            "confidence": confidence,
+            "bracket_id": bracket_id,
+            "metadata": metadata
+        }])[0]
+    
+    def save_trades_batch(self, trades: List[Dict]) -> List[int]:
+        """
+        Save several trade records in one transaction
+        
+        Args:
+            trades: Trade dicts with the same keys and defaults as save_trade's arguments
+        
+        Returns:
+            Row ids of the inserted trades, in order
+        """
+        if not trades:
+            return []
+        
+        rows = [
+            (
+                trade["symbol"], trade["action"], trade["quantity"], trade.get("price"),
+                trade.get("order_type", "MARKET"), trade.get("market"), trade.get("broker"),
+                trade.get("order_id"), trade.get("status", "pending"),
+                1 if trade.get("paper_trading", True) else 0, trade.get("decision_text"),
+                trade.get("confidence"), trade.get("bracket_id"), _to_json(trade.get("metadata"))
+            )
+            for trade in trades
+        ]
+        
+        def insert(conn: sqlite3.Connection) -> List[int]:
+            conn.executemany(_SQL_INSERT_TRADE, rows)
+            # The write lock is held, so AUTOINCREMENT ids are consecutive
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return list(range(last_id - len(rows) + 1, last_id + 1))
+        
+        return self._write(insert)
     
     def update_trade(
         self,
@@ -281,57 +742,43 @@ class TradingDatabase:
         error: str = None
     ) -> bool:
         """Update trade status"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            updates = []
-            params = []
-            
-            if status:
-                updates.append("status = ?")
-                params.append(status)
-            if fill_price:
-                updates.append("fill_price = ?, fill_time = ?")
-                params.extend([fill_price, datetime.now().isoformat()])
-            if error:
-                updates.append("error = ?")
-                params.append(error)
-            
-            if not updates:
-                return False
-            
-            params.append(trade_id)
-            cursor.execute(f"UPDATE trades SET {', '.join(updates)} WHERE id = ?", params)
-            return cursor.rowcount > 0
+        mask = bool(status) | bool(fill_price) << 1 | bool(error) << 2
+        if not mask:
+            return False
+        
+        params = []
+        if status:
+            params.append(status)
+        if fill_price:
+            params.append(fill_price)
+        if error:
+            params.append(error)
+        params.append(trade_id)
+        
+        cursor = self._execute(_SQL_UPDATE_TRADE[mask], tuple(params))
+        return cursor.rowcount > 0
     
     def get_trades(self, symbol: str = None, limit: int = 100) -> List[Dict]:
         """Get trade history"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
             if symbol:
-                cursor.execute(
-                    "SELECT * FROM trades WHERE symbol = ? ORDER BY created_at DESC LIMIT ?",
-                    (symbol, limit)
-                )
-            else:
-                cursor.execute(
-                    "SELECT * FROM trades ORDER BY created_at DESC LIMIT ?",
-                    (limit,)
-                )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+                return self._fetch_dicts(conn, _TRADE_COLS, _SQL_SELECT_SYMBOL_TRADES, (symbol, limit))
+            return self._fetch_dicts(conn, _TRADE_COLS, _SQL_SELECT_TRADES, (limit,))
     
     def get_today_trades(self) -> List[Dict]:
         """Get today's trades"""
-        today = datetime.now().strftime("%Y-%m-%d")
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM trades WHERE DATE(created_at) = ? ORDER BY created_at DESC",
-                (today,)
-            )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return self._fetch_dicts(conn, _TRADE_COLS, _SQL_SELECT_TODAY_TRADES, self._today_bounds())
+    
+    @staticmethod
+    def _today_bounds() -> Tuple[str, str]:
+        """created_at range [start, end) covering the local calendar day"""
+        today = date.today()
+        # created_at is CURRENT_TIMESTAMP, i.e. UTC "YYYY-MM-DD HH:MM:SS", so
+        # the local midnights are converted to UTC in the same format
+        start = datetime.combine(today, time.min).astimezone(timezone.utc)
+        end = datetime.combine(today + timedelta(days=1), time.min).astimezone(timezone.utc)
+        return start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
     
     # ==================== BRACKET ORDERS ====================
     
@@ -350,22 +797,14 @@ class TradingDatabase:
         trailing_activation_pct: float = None
     ) -> str:
         """Save a bracket order"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO bracket_orders 
-                (id, symbol, action, quantity, entry_price, stop_loss_pct, stop_loss_price,
-                 take_profit_pct, take_profit_price, trailing_stop_pct, trailing_activation_pct,
-                 highest_price, lowest_price, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active', CURRENT_TIMESTAMP)
-            """, (
-                bracket_id, symbol, action, quantity, entry_price,
-                stop_loss_pct, stop_loss_price, take_profit_pct, take_profit_price,
-                trailing_stop_pct, trailing_activation_pct,
-                entry_price if action == "BUY" else None,
-                entry_price if action == "SELL" else None
-            ))
-            return bracket_id
+        self._execute(_SQL_INSERT_BRACKET_ORDER, (
+            bracket_id, symbol, action, quantity, entry_price,
+            stop_loss_pct, stop_loss_price, take_profit_pct, take_profit_price,
+            trailing_stop_pct, trailing_activation_pct,
+            entry_price if action == "BUY" else None,
+            entry_price if action == "SELL" else None
+        ))
+        return bracket_id
     
     def update_bracket_order(
         self,
@@ -377,42 +816,33 @@ class TradingDatabase:
         trigger_reason: str = None
     ) -> bool:
         """Update bracket order"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            updates = []
-            params = []
-            
-            if status:
-                updates.append("status = ?")
-                params.append(status)
-            if stop_loss_price:
-                updates.append("stop_loss_price = ?")
-                params.append(stop_loss_price)
-            if highest_price:
-                updates.append("highest_price = ?")
-                params.append(highest_price)
-            if lowest_price:
-                updates.append("lowest_price = ?")
-                params.append(lowest_price)
-            if trigger_reason:
-                updates.append("trigger_reason = ?, triggered_at = ?")
-                params.extend([trigger_reason, datetime.now().isoformat()])
-            
-            if not updates:
-                return False
-            
-            params.append(bracket_id)
-            cursor.execute(f"UPDATE bracket_orders SET {', '.join(updates)} WHERE id = ?", params)
-            return cursor.rowcount > 0
+        mask = (
+            bool(status) | bool(stop_loss_price) << 1 | bool(highest_price) << 2
+            | bool(lowest_price) << 3 | bool(trigger_reason) << 4
+        )
+        if not mask:
+            return False
+        
+        params = []
+        if status:
+            params.append(status)
+        if stop_loss_price:
+            params.append(stop_loss_price)
+        if highest_price:
+            params.append(highest_price)
+        if lowest_price:
+            params.append(lowest_price)
+        if trigger_reason:
+            params.append(trigger_reason)
+        params.append(bracket_id)
+        
+        cursor = self._execute(_SQL_UPDATE_BRACKET_ORDER[mask], tuple(params))
+        return cursor.rowcount > 0
     
     def get_active_bracket_orders(self) -> List[Dict]:
         """Get all active bracket orders"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM bracket_orders WHERE status = 'active'")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return self._fetch_dicts(conn, _BRACKET_COLS, _SQL_SELECT_ACTIVE_BRACKET_ORDERS)
     
     # ==================== DAILY STATS ====================
     
@@ -424,94 +854,81 @@ class TradingDatabase:
         pnl: float = 0,
         volume: float = 0
     ):
-        """Update today's statistics"""
+        """
+        Update today's statistics in the legacy daily_stats table.
+
+        Deprecated: get_daily_stats() now derives the figures from closed
+        positions, so nothing reads what this writes.
+        """
+        global _update_daily_stats_warned
+        if not _update_daily_stats_warned:
+            _update_daily_stats_warned = True
+            warnings.warn(
+                "update_daily_stats is deprecated; daily stats are derived from closed positions",
+                DeprecationWarning,
+                stacklevel=2,
+            )
         today = datetime.now().strftime("%Y-%m-%d")
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get existing stats
-            cursor.execute("SELECT * FROM daily_stats WHERE date = ?", (today,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute("""
-                    UPDATE daily_stats SET
-                        trades_count = trades_count + ?,
-                        winning_trades = winning_trades + ?,
-                        losing_trades = losing_trades + ?,
-                        total_pnl = total_pnl + ?,
-                        volume_traded = volume_traded + ?,
-                        largest_win = MAX(largest_win, ?),
-                        largest_loss = MIN(largest_loss, ?)
-                    WHERE date = ?
-                """, (
-                    trades_count, winning_trades, losing_trades, pnl, volume,
-                    pnl if pnl > 0 else 0, pnl if pnl < 0 else 0, today
-                ))
-            else:
-                cursor.execute("""
-                    INSERT INTO daily_stats 
-                    (date, trades_count, winning_trades, losing_trades, total_pnl,
-                     volume_traded, largest_win, largest_loss)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    today, trades_count, winning_trades, losing_trades, pnl, volume,
-                    pnl if pnl > 0 else 0, pnl if pnl < 0 else 0
-                ))
+        self._execute(_SQL_UPSERT_DAILY_STATS, (
+            today, trades_count, winning_trades, losing_trades, pnl, volume,
+            pnl if pnl > 0 else 0, pnl if pnl < 0 else 0
+        ))
     
     def get_daily_stats(self, date: str = None) -> Optional[Dict]:
-        """Get daily statistics"""
+        """Get daily statistics, computed from the positions closed that day"""
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM daily_stats WHERE date = ?", (date,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            rows = self._fetch_dicts(conn, _DAILY_STATS_COLS, _SQL_SELECT_DAILY_STATS, (date,))
+            return rows[0] if rows else None
     
     # ==================== SETTINGS ====================
     
     def save_setting(self, key: str, value: Any):
         """Save a setting"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO settings (key, value, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-            """, (key, json.dumps(value)))
+        self._execute(_SQL_UPSERT_SETTING, (key, json.dumps(value)))
     
     def get_setting(self, key: str, default: Any = None) -> Any:
         """Get a setting"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            row = cursor.fetchone()
+            row = conn.execute(_SQL_SELECT_SETTING, (key,)).fetchone()
             if row:
-                return json.loads(row["value"])
+                return json.loads(row[0])
             return default
     
     # ==================== RECOVERY ====================
     
     def export_state(self) -> Dict:
         """Export full state for backup"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        # One read transaction, so positions and brackets come from the same snapshot
+        with self._get_connection() as conn:
+            positions = self._fetch_dicts(conn, _POSITION_COLS, _SQL_SELECT_OPEN_POSITIONS)
+            bracket_orders = self._fetch_dicts(conn, _BRACKET_COLS, _SQL_SELECT_ACTIVE_BRACKET_ORDERS)
+            today_trades = self._fetch_dicts(conn, _TRADE_COLS, _SQL_SELECT_TODAY_TRADES, self._today_bounds())
+            stats_rows = self._fetch_dicts(conn, _DAILY_STATS_COLS, _SQL_SELECT_DAILY_STATS, (today,))
+        
         return {
-            "positions": self.get_open_positions(),
-            "bracket_orders": self.get_active_bracket_orders(),
-            "today_trades": self.get_today_trades(),
-            "daily_stats": self.get_daily_stats(),
+            "positions": positions,
+            "bracket_orders": bracket_orders,
+            "today_trades": today_trades,
+            "daily_stats": stats_rows[0] if stats_rows else None,
             "exported_at": datetime.now().isoformat()
         }
     
     def get_portfolio_summary(self) -> Dict:
         """Get portfolio summary"""
-        positions = self.get_open_positions()
+        # Count and value the open positions in SQLite rather than loading them
+        with self._get_connection() as conn:
+            open_positions, total_value = conn.execute(_SQL_SELECT_OPEN_POSITION_TOTALS).fetchone()
         today_stats = self.get_daily_stats() or {}
         
         return {
-            "open_positions": len(positions),
-            "total_value": sum(p["quantity"] * p["entry_price"] for p in positions),
+            "open_positions": open_positions,
+            "total_value": total_value,
             "today_trades": today_stats.get("trades_count", 0),
             "today_pnl": today_stats.get("total_pnl", 0),
             "win_rate": (
@@ -2,7 +2,9 @@
 Market detection utility to route symbols to correct brokers
 """
 
-from typing import Dict, Optional, Tuple
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dashboard.multiuser.brokers.unified_broker import (
     Market,
     BrokerType,
@@ -14,94 +16,158 @@ from dashboard.multiuser.brokers.unified_broker import (
 )
 
 
-class MarketDetector:
-    """Detect market type and route to appropriate broker"""
+# Splits an undashed crypto symbol into base and optional quote currency
+_QUOTE_RE = re.compile(r'^(?P<base>.+?)(?P<quote>USDT|USD|BTC)?$')
+
+# Crypto symbol formats keyed by (broker, symbol has a dash, quote); a quote
+# of None is the fallback for that broker and dash combination
+_SYMBOL_FORMATS: Dict[Tuple[BrokerType, bool, Optional[str]], str] = {
+    # Binance: BTCUSDT, keeping pairs already quoted in USDT or BTC
+    (BrokerType.BINANCE, True, None): "{base}USDT",
+    (BrokerType.BINANCE, False, None): "{base}USDT",
+    (BrokerType.BINANCE, False, "USDT"): "{symbol}",
+    (BrokerType.BINANCE, False, "BTC"): "{symbol}",
+    # Coinbase: BTC-USD
+    (BrokerType.COINBASE, True, None): "{symbol}",
+    (BrokerType.COINBASE, True, "USDT"): "{base}-USD",
+    (BrokerType.COINBASE, False, None): "{base}-USD",
+    (BrokerType.COINBASE, False, "BTC"): "{symbol}-USD",
+}
+
+
+# Indian stock patterns
+_INDIAN_STOCK_PATTERNS = frozenset({
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "SBIN",
+    "BHARTIARTL", "ITC", "WIPRO", "MARUTI", "HINDUNILVR",
+    "BAJFINANCE", "ASIANPAINT", "HCLTECH", "KOTAKBANK"
+})
+
+# Crypto patterns
+_CRYPTO_BASES = frozenset({
+    "BTC", "ETH", "BNB", "ADA", "SOL", "XRP", "DOT", "DOGE",
+    "MATIC", "AVAX", "LINK", "UNI", "ATOM", "ALGO", "VET",
+    "TRX", "LTC", "BCH", "EOS", "XLM"
+})
+
+# US stock patterns (common tickers)
+_US_STOCK_PATTERNS = frozenset({
+    "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "TSLA", "META",
+    "JPM", "V", "JNJ", "WMT", "PG", "MA", "DIS", "NFLX",
+    "ADBE", "INTC", "CSCO", "PEP", "COST"
+})
+
+# Patterns plus the popular stocks of each region, flattened once
+_INDIAN_SYMBOLS = _INDIAN_STOCK_PATTERNS.union(
+    *(POPULAR_STOCKS.get(market, {}) for market in (Market.INDIA_NSE, Market.INDIA_BSE))
+)
+_US_SYMBOLS = _US_STOCK_PATTERNS.union(
+    *(POPULAR_STOCKS.get(market, {}) for market in (Market.US_NYSE, Market.US_NASDAQ, Market.US_AMEX))
+)
 
-    # Indian stock patterns
-    INDIAN_STOCK_PATTERNS = [
-        "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "SBIN",
-        "BHARTIARTL", "ITC", "WIPRO", "MARUTI", "HINDUNILVR",
-        "BAJFINANCE", "ASIANPAINT", "HCLTECH", "KOTAKBANK"
-    ]
-
-    # Crypto patterns
-    CRYPTO_BASES = [
-        "BTC", "ETH", "BNB", "ADA", "SOL", "XRP", "DOT", "DOGE",
-        "MATIC", "AVAX", "LINK", "UNI", "ATOM", "ALGO", "VET",
-        "TRX", "LTC", "BCH", "EOS", "XLM"
-    ]
-
-    # US stock patterns (common tickers)
-    US_STOCK_PATTERNS = [
-        "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "TSLA", "META",
-        "JPM", "V", "JNJ", "WMT", "PG", "MA", "DIS", "NFLX",
-        "ADBE", "INTC", "CSCO", "PEP", "COST"
-    ]
 
-    @staticmethod
-    def detect_market(symbol: str) -> Market:
-        """
-        Detect market type from symbol
+def _is_crypto(symbol: str) -> bool:
+    """Check if symbol is crypto"""
+    crypto_bases = _CRYPTO_BASES
 
-        Args:
-            symbol: Trading symbol (e.g., "BTC-USD", "AAPL", "RELIANCE")
+    # Check for common crypto patterns
+    if "-" in symbol:
+        base = symbol.split("-")[0]
+        return base in crypto_bases
 
-        Returns:
-            Market enum
-        """
-        symbol_upper = symbol.upper().strip()
+    if symbol.endswith("USDT") or symbol.endswith("BTC") or symbol.endswith("USD"):
+        base = symbol.replace("USDT", "").replace("BTC", "").replace("USD", "")
+        return base in crypto_bases or len(base) <= 5
 
-        # Check for crypto patterns
-        if MarketDetector._is_crypto_symbol(symbol_upper):
-            return Market.CRYPTO
+    # Check if it's a known crypto base
+    return symbol in crypto_bases
 
-        # Check Indian stocks
-        if MarketDetector._is_indian_stock(symbol_upper):
-            return Market.INDIA_NSE  # Default to NSE
 
-        # Check US stocks
-        if MarketDetector._is_us_stock(symbol_upper):
-            return Market.US_NYSE  # Default to NYSE
+def _is_indian(symbol: str) -> bool:
+    """Check if symbol is Indian stock"""
+    return symbol in _INDIAN_SYMBOLS
 
-        # Use unified broker function as fallback
-        return get_market_for_ticker(symbol_upper)
 
-    @staticmethod
-    def _is_crypto_symbol(symbol: str) -> bool:
-        """Check if symbol is crypto"""
-        # Check for common crypto patterns
-        if "-" in symbol:
-            base = symbol.split("-")[0]
-            return base in MarketDetector.CRYPTO_BASES
+def _is_us(symbol: str) -> bool:
+    """Check if symbol is US stock"""
+    return symbol in _US_SYMBOLS
 
-        if symbol.endswith("USDT") or symbol.endswith("BTC") or symbol.endswith("USD"):
-            base = symbol.replace("USDT", "").replace("BTC", "").replace("USD", "")
-            return base in MarketDetector.CRYPTO_BASES or len(base) <= 5
 
-        # Check if it's a known crypto base
-        return symbol in MarketDetector.CRYPTO_BASES
+@lru_cache(maxsize=4096)
+def _detect_market(symbol: str) -> Market:
+    """
+    Detect market type from symbol
 
-    @staticmethod
-    def _is_indian_stock(symbol: str) -> bool:
-        """Check if symbol is Indian stock"""
-        # Check popular stocks
-        for market in [Market.INDIA_NSE, Market.INDIA_BSE]:
-            if symbol in POPULAR_STOCKS.get(market, {}):
-                return True
+    Results are cached per symbol string; symbol to market is fixed.
+
+    Args:
+        symbol: Trading symbol (e.g., "BTC-USD", "AAPL", "RELIANCE")
+
+    Returns:
+        Market enum
+    """
+    symbol_upper = symbol.upper().strip()
+
+    # Check for crypto patterns
+    if _is_crypto(symbol_upper):
+        return Market.CRYPTO
+
+    # Check Indian stocks
+    if symbol_upper in _INDIAN_SYMBOLS:
+        return Market.INDIA_NSE  # Default to NSE
+
+    # Check US stocks
+    if symbol_upper in _US_SYMBOLS:
+        return Market.US_NYSE  # Default to NYSE
+
+    # Use unified broker function as fallback
+    return get_market_for_ticker(symbol_upper)
+
+
+def _broker_supports_market(broker_type: BrokerType, market: Market) -> bool:
+    """Check if broker supports the market"""
+    if is_indian_market(market):
+        return broker_type in [BrokerType.ZERODHA, BrokerType.UPSTOX, BrokerType.SIMULATED]
+    elif is_us_market(market):
+        return broker_type in [BrokerType.ALPACA, BrokerType.SIMULATED]
+    elif is_crypto_market(market):
+        return broker_type in [BrokerType.BINANCE, BrokerType.COINBASE, BrokerType.SIMULATED]
+    return False
 
-        # Check patterns
-        return symbol in MarketDetector.INDIAN_STOCK_PATTERNS
+
+class MarketDetector:
+    """Detect market type and route to appropriate broker"""
+
+    INDIAN_STOCK_PATTERNS = _INDIAN_STOCK_PATTERNS
+    CRYPTO_BASES = _CRYPTO_BASES
+    US_STOCK_PATTERNS = _US_STOCK_PATTERNS
+
+    # The detection helpers live at module level; these keep the class API
+    detect_market = staticmethod(_detect_market)
+    _is_crypto_symbol = staticmethod(_is_crypto)
+    _is_indian_stock = staticmethod(_is_indian)
+    _is_us_stock = staticmethod(_is_us)
+    _broker_supports_market = staticmethod(_broker_supports_market)
 
     @staticmethod
-    def _is_us_stock(symbol: str) -> bool:
-        """Check if symbol is US stock"""
-        # Check popular stocks
-        for market in [Market.US_NYSE, Market.US_NASDAQ, Market.US_AMEX]:
-            if symbol in POPULAR_STOCKS.get(market, {}):
-                return True
+    def detect_market_batch(symbols: List[str]) -> List[Market]:
+        """
+        Detect market types for many symbols at once
 
-        # Check patterns
-        return symbol in MarketDetector.US_STOCK_PATTERNS
+        Known symbols resolve with one dict lookup; the rest fall back to
+        detect_market.
+
+        Args:
+            symbols: Trading symbols
+
+        Returns:
+            Market enums, in the same order as symbols
+        """
+        upper = [symbol.upper().strip() for symbol in symbols]
+        markets = [_SYMBOL_TO_MARKET.get(symbol) for symbol in upper]
+        for i, market in enumerate(markets):
+            if market is None:
+                markets[i] = _detect_market(upper[i])
+        return markets
 
     @staticmethod
     def get_broker_type(market: Market, preferred_broker: Optional[BrokerType] = None) -> BrokerType:
@@ -117,7 +183,7 @@ class MarketDetector:
         """
         if preferred_broker:
             # Validate that preferred broker supports the market
-            if MarketDetector._broker_supports_market(preferred_broker, market):
+            if _broker_supports_market(preferred_broker, market):
                 return preferred_broker
 
         # Default broker selection
@@ -131,17 +197,7 @@ class MarketDetector:
             return BrokerType.SIMULATED  # Fallback to simulated
 
     @staticmethod
-    def _broker_supports_market(broker_type: BrokerType, market: Market) -> bool:
-        """Check if broker supports the market"""
-        if is_indian_market(market):
-            return broker_type in [BrokerType.ZERODHA, BrokerType.UPSTOX, BrokerType.SIMULATED]
-        elif is_us_market(market):
-            return broker_type in [BrokerType.ALPACA, BrokerType.SIMULATED]
-        elif is_crypto_market(market):
-            return broker_type in [BrokerType.BINANCE, BrokerType.COINBASE, BrokerType.SIMULATED]
-        return False
-
-    @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_symbol(symbol: str, market: Market, broker_type: BrokerType) -> str:
         """
         Normalize symbol format for specific broker
@@ -154,29 +210,22 @@ class MarketDetector:
         Returns:
             Normalized symbol
         """
-        if is_crypto_market(market):
-            if broker_type == BrokerType.BINANCE:
-                # Convert to Binance format (BTCUSDT)
-                if "-" in symbol:
-                    base = symbol.split("-")[0]
-                    return f"{base}USDT"
-                elif not symbol.endswith("USDT") and not symbol.endswith("BTC"):
-                    return f"{symbol}USDT"
-                return symbol
-            elif broker_type == BrokerType.COINBASE:
-                # Convert to Coinbase format (BTC-USD)
-                if not "-" in symbol:
-                    if symbol.endswith("USDT"):
-                        base = symbol.replace("USDT", "")
-                        return f"{base}-USD"
-                    return f"{symbol}-USD"
-                elif symbol.endswith("USDT"):
-                    base = symbol.replace("USDT", "")
-                    return f"{base}-USD"
-                return symbol
-
         # For stocks, return as-is (brokers handle their own formats)
-        return symbol
+        if not symbol or not is_crypto_market(market):
+            return symbol
+
+        dashed = "-" in symbol
+        if dashed:
+            base, _, quote = symbol.partition("-")
+        else:
+            match = _QUOTE_RE.match(symbol)
+            base, quote = match.group("base"), match.group("quote")
+
+        fmt = (_SYMBOL_FORMATS.get((broker_type, dashed, quote))
+               or _SYMBOL_FORMATS.get((broker_type, dashed, None)))
+        if fmt is None:
+            return symbol
+        return fmt.format(base=base, symbol=symbol)
 
     @staticmethod
     def get_exchange_for_market(market: Market) -> str:
@@ -205,6 +254,23 @@ class MarketDetector:
             return "UNKNOWN"
 
 
+# Every known symbol (and the usual pair spellings of each crypto base)
+# classified once at import, for detect_market_batch
+_SYMBOL_TO_MARKET: Dict[str, Market] = {
+    symbol: _detect_market(symbol)
+    for symbol in (
+        _INDIAN_SYMBOLS
+        | _US_SYMBOLS
+        | {
+            pair
+            for base in _CRYPTO_BASES
+            for pair in (base, f"{base}-USD", f"{base}USDT")
+        }
+    )
+}
+
+
+@lru_cache(maxsize=4096)
 def detect_market_and_broker(
     symbol: str,
     preferred_broker: Optional[BrokerType] = None
@@ -212,6 +278,8 @@ def detect_market_and_broker(
     """
     Detect market, broker, and normalized symbol in one call
 
+    Cached per (symbol, preferred_broker), as the result depends on nothing else.
+
     Args:
         symbol: Trading symbol
         preferred_broker: Preferred broker type
@@ -219,7 +287,7 @@ def detect_market_and_broker(
     Returns:
         Tuple of (market, broker_type, normalized_symbol)
     """
-    market = MarketDetector.detect_market(symbol)
+    market = _detect_market(symbol)
     broker_type = MarketDetector.get_broker_type(market, preferred_broker)
     normalized_symbol = MarketDetector.normalize_symbol(symbol, market, broker_type)
 
@@ -9,6 +9,8 @@ Checks:
 import sys
 import os
 import logging
+import importlib.util
+from functools import lru_cache
 from datetime import datetime
 import pytz
 
@@ -23,19 +25,32 @@ from dashboard.multiuser.brokers.unified_broker import BrokerType
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+_SYMBOL_TEST_CASES = (
+    ("RELIANCE", Market.INDIA_NSE),
+    ("TCS", Market.INDIA_NSE),
+    ("SBIN", Market.INDIA_NSE),
+    ("AAPL", Market.US_NYSE),  # Control case
+    ("BTC-USD", Market.CRYPTO)  # Control case
+)
+
+@lru_cache(maxsize=1)
+def _zerodha_importable() -> bool:
+    """Import ZerodhaKiteAPI once, on first use, and remember whether it worked"""
+    # The broker module imports kiteconnect lazily, so probe it separately
+    if importlib.util.find_spec("kiteconnect") is None:
+        return False
+    try:
+        from dashboard.multiuser.brokers.zerodha import ZerodhaKiteAPI  # noqa: F401
+    except Exception:
+        logger.exception("Importing ZerodhaKiteAPI failed")
+        return False
+    return True
+
 def verify_symbol_detection():
     logger.info("--- Verifying Symbol Detection ---")
     
-    test_cases = [
-        ("RELIANCE", Market.INDIA_NSE),
-        ("TCS", Market.INDIA_NSE),
-        ("SBIN", Market.INDIA_NSE),
-        ("AAPL", Market.US_NYSE),  # Control case
-        ("BTC-USD", Market.CRYPTO) # Control case
-    ]
-    
     all_passed = True
-    for symbol, expected_market in test_cases:
+    for symbol, expected_market in _SYMBOL_TEST_CASES:
         market = MarketDetector.detect_market(symbol)
         if market == expected_market:
             logger.info(f"✅ Correctly detected {symbol} as {market.value}")
@@ -77,16 +92,16 @@ def verify_broker_integration():
     logger.info("\n--- Verifying Broker Integration (Zerodha) ---")
     
     # Check if Zerodha class is importable
-    try:
-        from dashboard.multiuser.brokers.zerodha import ZerodhaKiteAPI
+    if _zerodha_importable():
         logger.info("✅ ZerodhaKiteAPI class is importable")
-    except ImportError:
+    else:
         logger.error("❌ Could not import ZerodhaKiteAPI. Missing requirements? (pip install kiteconnect)")
         return False
         
     # Check for credentials (just existence)
-    api_key = os.getenv("ZERODHA_API_KEY")
-    api_secret = os.getenv("ZERODHA_API_SECRET")
+    env = os.environ
+    api_key = env.get("ZERODHA_API_KEY")
+    api_secret = env.get("ZERODHA_API_SECRET")
     
     if api_key and api_secret:
         logger.info("✅ Zerodha credentials found in environment")
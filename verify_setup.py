@@ -8,6 +8,14 @@ import sys
 import importlib.util
 from pathlib import Path
 
+_REQUIRED_PKGS = (
+    "langchain_openai", "langchain_anthropic", "langgraph",
+    "pandas", "yfinance", "streamlit", "sqlite3"
+)
+
+# LLM provider keys; optional depending on config but checking for common ones
+_LLM_API_KEYS = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "OPENROUTER_API_KEY")
+
 def check_python_version():
     print(f"Checking Python version... {sys.version.split()[0]}")
     if sys.version_info < (3, 9):
@@ -18,16 +26,9 @@ def check_python_version():
 
 def check_dependencies():
     print("\nChecking core dependencies...")
-    required = [
-        "langchain_openai", "langchain_anthropic", "langgraph", 
-        "pandas", "yfinance", "streamlit", "sqlite3"
-    ]
-    missing = []
-    for pkg in required:
-        if importlib.util.find_spec(pkg) is None and importlib.util.find_spec(pkg.replace("-", "_")) is None:
-            # Handle special cases like sqlite3 (built-in usually)
-            if pkg == "sqlite3": continue
-            missing.append(pkg)
+    # Entries are import names, so one find_spec each tests importability
+    # directly (sqlite3 included) without reading distribution metadata
+    missing = [pkg for pkg in _REQUIRED_PKGS if importlib.util.find_spec(pkg) is None]
     
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}")
@@ -38,12 +39,8 @@ def check_dependencies():
 
 def check_env_vars():
     print("\nChecking environment variables...")
-    # These are optional depending on config but checking for common ones
-    keys = ["OPENAI_API_KEY", "ANTHROPIC_API_KEY", "OPENROUTER_API_KEY"]
-    found = []
-    for key in keys:
-        if os.getenv(key):
-            found.append(key)
+    env = os.environ
+    found = [key for key in _LLM_API_KEYS if env.get(key)]
     
     if not found:
         print("⚠️  No LLM API keys found in environment variables.")
@@ -59,10 +56,12 @@ def check_directories():
     required = ["dashboard", "tradingagents", "results", "data"]
     
     for d in required:
-        p = current / d
-        if not p.exists():
-            print(f"⚠️  Directory '{d}' missing. Creating...")
-            p.mkdir(exist_ok=True)
+        # mkdir alone tells us whether the directory was missing
+        try:
+            (current / d).mkdir()
+        except FileExistsError:
+            continue
+        print(f"⚠️  Directory '{d}' was missing. Created it.")
             
     # Check data/llm_cache.db path
     db_path = current / "dashboard" / "data"